@@ -1,13 +1,44 @@
 """Watts Vision Component."""
 
 import logging
+from time import monotonic
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.event import async_track_time_interval
-
-from .const import API_CLIENT, DOMAIN, SCAN_INTERVAL
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.storage import Store
+
+from .connection_pool import async_acquire_pool, async_release_pool
+from .const import (
+    API_CLIENT,
+    API_URL,
+    AUTH_URL,
+    CONF_API_URL,
+    CONF_AUTH_URL,
+    CONF_COMMAND_DELAY,
+    CONF_KEEP_RAW,
+    CONF_LAST_COMMUNICATION_INTERVAL,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_IN_FLIGHT,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    COORDINATOR,
+    DEFAULT_COMMAND_DELAY,
+    DEFAULT_KEEP_RAW,
+    DEFAULT_LAST_COMMUNICATION_INTERVAL,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DOMAIN,
+    THERMOSTATS,
+)
+from .coordinator import WattsVisionCoordinator
+from .handover import async_pop_session
+from .services import async_setup_services, async_unload_services
+from .snapshot import dump_smarthomes, load_smarthomes, snapshot_store
+from .token_manager import token_store
 from .watts_api import WattsApi
 
 _LOGGER = logging.getLogger(__name__)
@@ -18,33 +49,137 @@ PLATFORMS = [Platform.BINARY_SENSOR, Platform.SENSOR, Platform.CLIMATE]
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Watts Vision from a config entry."""
     _LOGGER.debug("Set up Watts Vision")
+    started = monotonic()
     hass.data.setdefault(DOMAIN, {})
 
-    client = WattsApi(hass, entry.data[CONF_USERNAME], entry.data[CONF_PASSWORD])
+    pool = async_acquire_pool(hass, entry.entry_id)
+    client = WattsApi(
+        hass,
+        entry.data[CONF_USERNAME],
+        entry.data[CONF_PASSWORD],
+        entry.options.get(
+            CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+        ),
+        entry.options.get(CONF_MAX_IN_FLIGHT, DEFAULT_MAX_IN_FLIGHT),
+        entry.options.get(CONF_COMMAND_DELAY, DEFAULT_COMMAND_DELAY),
+        entry.data.get(CONF_API_URL, API_URL),
+        entry.data.get(CONF_AUTH_URL, AUTH_URL),
+        pool,
+        entry.options.get(CONF_KEEP_RAW, DEFAULT_KEEP_RAW),
+    )
+
+    snapshots = snapshot_store(hass, entry.data[CONF_USERNAME])
+    coordinator = WattsVisionCoordinator(
+        hass,
+        client,
+        entry.options.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL),
+        entry.options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+        snapshots,
+        entry.options.get(
+            CONF_LAST_COMMUNICATION_INTERVAL, DEFAULT_LAST_COMMUNICATION_INTERVAL
+        ),
+    )
+
+    entry.async_on_unload(
+        client.circuitBreaker.add_listener(coordinator.async_circuit_changed)
+    )
+
+    if (session := async_pop_session(hass, entry.data)) is not None:
+        # Just logged in by the config or options flow, continue with its
+        # tokens and smart homes and load the devices right away.
+        client.restoreSession(session)
+        snapshot = None
+    else:
+        snapshot = await snapshots.async_load()
+
+    if snapshot is not None:
+        # Create the entities from the devices known before the restart and
+        # refresh them from the cloud once setup is done.
+        client.restoreSmartHomes(load_smarthomes(snapshot))
+        coordinator.stale = True
+        # The devices are already known, hand them to the coordinator so it
+        # only starts polling from the next interval on.
+        coordinator.async_set_updated_data(client.getSmartHomes())
+    else:
+        # Nothing to create the entities from yet, load everything in a single
+        # refresh. Home Assistant retries the setup in the background if it fails.
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except ConfigEntryNotReady:
+            await client.close()
+            async_release_pool(hass, entry.entry_id)
+            raise
+
+    hass.data[DOMAIN][entry.entry_id] = {
+        API_CLIENT: client,
+        COORDINATOR: coordinator,
+        THERMOSTATS: {},
+    }
 
-    try:
-        await hass.async_add_executor_job(client.getLoginToken)
-    except Exception as exception:  # pylint: disable=broad-except
-        _LOGGER.exception(exception)
-        return False
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    await hass.async_add_executor_job(client.loadData)
+    async_setup_services(hass)
 
-    hass.data[DOMAIN][API_CLIENT] = client
+    coordinator.setup_duration = monotonic() - started
+    _LOGGER.info(
+        "Set up Watts Vision in %.2f seconds%s",
+        coordinator.setup_duration,
+        ", from the snapshot" if coordinator.stale else "",
+    )
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    if coordinator.stale:
+        entry.async_create_background_task(
+            hass,
+            _async_refresh_snapshot(hass, entry, coordinator, snapshots, started),
+            f"{DOMAIN} refresh snapshot",
+        )
 
-    async def refresh_devices(event_time):
-        await hass.async_add_executor_job(client.reloadDevices)
+    return True
 
-    async_track_time_interval(hass, refresh_devices, SCAN_INTERVAL)
 
-    return True
+async def _async_refresh_snapshot(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinator: WattsVisionCoordinator,
+    snapshots: Store,
+    started: float,
+) -> None:
+    """Refresh the restored devices, reload the entry when devices came or went."""
+    client = coordinator.client
+    restored = {(smarthome, id) for smarthome, id, _ in client.iterDevices()}
+
+    await coordinator.async_refresh()
+    if not coordinator.last_update_success:
+        return
+
+    _LOGGER.info(
+        "Refreshed the snapshot %.2f seconds after setup started",
+        monotonic() - started,
+    )
+
+    if {(smarthome, id) for smarthome, id, _ in client.iterDevices()} != restored:
+        _LOGGER.info("Devices changed since the last snapshot, reloading")
+        await snapshots.async_save(dump_smarthomes(client.getSmartHomes()))
+        hass.config_entries.async_schedule_reload(entry.entry_id)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     _LOGGER.debug("Unloading Watts Vision")
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(API_CLIENT)
+        client: WattsApi = hass.data[DOMAIN].pop(entry.entry_id)[API_CLIENT]
+        # The services are shared by all entries, remove them with the last one
+        if not any(
+            other.entry_id in hass.data[DOMAIN]
+            for other in hass.config_entries.async_entries(DOMAIN)
+        ):
+            async_unload_services(hass)
+        await client.close()
+        async_release_pool(hass, entry.entry_id)
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the persisted refresh token and snapshot of a removed config entry."""
+    await token_store(hass, entry.data[CONF_USERNAME]).async_remove()
+    await snapshot_store(hass, entry.data[CONF_USERNAME]).async_remove()
@@ -1,4 +1,3 @@
-from datetime import timedelta
 import logging
 from typing import Callable
 
@@ -6,21 +5,23 @@ from homeassistant.components.binary_sensor import BinarySensorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
-from .const import API_CLIENT, DOMAIN
-from .watts_api import WattsApi
+from .const import COORDINATOR, DOMAIN
+from .coordinator import WattsVisionCoordinator
+from .device import WattsDevice
+from .entity import WattsVisionEntity
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(seconds=120)
-
 
 async def async_setup_entry(
     hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities: Callable
 ):
     """Set up the binary_sensor platform."""
-    wattsClient: WattsApi = hass.data[DOMAIN][API_CLIENT]
+    coordinator: WattsVisionCoordinator = hass.data[DOMAIN][config_entry.entry_id][
+        COORDINATOR
+    ]
 
-    smartHomes = wattsClient.getSmartHomes()
+    smartHomes = coordinator.client.getSmartHomes()
 
     sensors = []
 
@@ -32,24 +33,23 @@ async def async_setup_entry(
                         for x in range(len(smartHomes[y]["zones"][z]["devices"])):
                             sensors.append(
                                 WattsVisionHeatingBinarySensor(
-                                    wattsClient,
+                                    coordinator,
                                     smartHomes[y]["smarthome_id"],
-                                    smartHomes[y]["zones"][z]["devices"][x]["id"],
+                                    smartHomes[y]["zones"][z]["devices"][x].id,
                                     smartHomes[y]["zones"][z]["zone_label"],
                                 )
                             )
 
-    async_add_entities(sensors, update_before_add=True)
+    async_add_entities(sensors)
 
 
-class WattsVisionHeatingBinarySensor(BinarySensorEntity):
+class WattsVisionHeatingBinarySensor(WattsVisionEntity, BinarySensorEntity):
     """Representation of a Watts Vision thermostat."""
 
-    def __init__(self, wattsClient: WattsApi, smartHome: str, id: str, zone: str):
-        super().__init__()
-        self.client = wattsClient
-        self.smartHome = smartHome
-        self.id = id
+    def __init__(
+        self, coordinator: WattsVisionCoordinator, smartHome: str, id: str, zone: str
+    ):
+        super().__init__(coordinator, smartHome, id)
         self.zone = zone
         self._name = "Heating " + zone
         self._state: bool = False
@@ -83,13 +83,5 @@ class WattsVisionHeatingBinarySensor(BinarySensorEntity):
             "via_device": (DOMAIN, self.smartHome),
         }
 
-    async def async_update(self):
-        # try:
-        smartHomeDevice = self.client.getDevice(self.smartHome, self.id)
-        if smartHomeDevice["heating_up"] == "0":
-            self._state = False
-        else:
-            self._state = True
-        # except:
-        #     self._available = False
-        #     _LOGGER.exception("Error retrieving data.")
+    def _update_state(self, smartHomeDevice: WattsDevice) -> None:
+        self._state = smartHomeDevice.heating_up
@@ -2,21 +2,35 @@
 from typing import Optional
 
 from homeassistant.components.sensor import SensorEntity
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
-from .watts_api import WattsApi
+from .const import CIRCUIT_OPEN, DOMAIN
+from .coordinator import WattsVisionCoordinator
 
 
-class WattsVisionLastCommunicationSensor(SensorEntity):
-    def __init__(self, wattsClient: WattsApi, smartHome: str, label: str, mac_address: str):
-        super().__init__()
-        self.client = wattsClient
+class WattsVisionLastCommunicationSensor(
+    CoordinatorEntity[WattsVisionCoordinator], SensorEntity
+):
+    """Last communication of a central unit, fetched by the coordinator."""
+
+    def __init__(
+        self,
+        coordinator: WattsVisionCoordinator,
+        smartHome: str,
+        label: str,
+        mac_address: str,
+    ):
+        super().__init__(coordinator)
+        self.client = coordinator.client
         self.smartHome = smartHome
         self._label = label
         self._name = "Last communication " + self._label
         self._state = None
         self._available = True
         self._mac_address = mac_address
+        self._data = None
+        self._written = None
 
     @property
     def unique_id(self) -> str:
@@ -32,6 +46,10 @@ class WattsVisionLastCommunicationSensor(SensorEntity):
     def state(self) -> Optional[str]:
         return self._state
 
+    @property
+    def available(self) -> bool:
+        return super().available and self.coordinator.circuit_state != CIRCUIT_OPEN
+
     @property
     def device_info(self):
         return {
@@ -47,10 +65,30 @@ class WattsVisionLastCommunicationSensor(SensorEntity):
             }
         }
 
-    async def async_update(self):
-        data = await self.hass.async_add_executor_job(
-            self.client.getLastCommunication, self.smartHome
-        )
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._update_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # Only write when a new last communication was fetched, or the
+        # availability changed
+        if (
+            self.client.getCachedLastCommunication(self.smartHome) is self._data
+            and self.available == self._written
+        ):
+            return
+
+        self._update_state()
+        self._written = self.available
+        super()._handle_coordinator_update()
+
+    @callback
+    def _update_state(self) -> None:
+        data = self.client.getCachedLastCommunication(self.smartHome)
+        self._data = data
+        if data is None:
+            return
 
         self._state = "{} days, {} hours, {} minutes and {} seconds.".format(
             data["diffObj"]["days"],
@@ -0,0 +1,91 @@
+"""Circuit breaker stopping requests while the Watts Vision cloud is down."""
+import logging
+from time import monotonic
+from typing import Callable
+
+from aiohttp import ClientError
+
+from .const import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    CIRCUIT_RESET_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CircuitOpenError(ClientError):
+    """Error to indicate a request was not sent because the circuit is open."""
+
+
+class CircuitBreaker:
+    """Open after ``failure_threshold`` failed requests in a row.
+
+    While open every request fails right away with CircuitOpenError. After
+    ``reset_timeout`` seconds the breaker is half open and lets a single probe
+    through: the circuit closes when it succeeds and opens again when it fails.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+    ):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._listeners: list[Callable[[str, str], None]] = []
+        self.state = CIRCUIT_CLOSED
+
+    def add_listener(self, listener: Callable[[str, str], None]) -> Callable[[], None]:
+        """Call listener(state, previous_state) on transitions, returns a remover."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the open circuit lets a probe through."""
+        if self.state != CIRCUIT_OPEN:
+            return 0.0
+        return max(self._opened_at + self._reset_timeout - monotonic(), 0.0)
+
+    def before_request(self) -> None:
+        """Raise CircuitOpenError unless a request may be sent now."""
+        if self.state == CIRCUIT_OPEN:
+            if self.retry_in > 0:
+                raise CircuitOpenError("The Watts Vision cloud is unavailable")
+            self._transition(CIRCUIT_HALF_OPEN)
+
+        if self.state == CIRCUIT_HALF_OPEN:
+            if self._probing:
+                raise CircuitOpenError("Waiting for the Watts Vision cloud to recover")
+            self._probing = True
+
+    def release(self) -> None:
+        """Let another probe through after one ended without a result."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probing = False
+        if self.state != CIRCUIT_CLOSED:
+            self._transition(CIRCUIT_CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probing = False
+        if self.state == CIRCUIT_HALF_OPEN or (
+            self.state == CIRCUIT_CLOSED and self._failures >= self._failure_threshold
+        ):
+            self._opened_at = monotonic()
+            self._transition(CIRCUIT_OPEN)
+
+    def _transition(self, state: str) -> None:
+        previous, self.state = self.state, state
+        _LOGGER.info("Circuit breaker went from %s to %s", previous, state)
+        for listener in list(self._listeners):
+            listener(state, previous)
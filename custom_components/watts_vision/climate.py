@@ -1,4 +1,3 @@
-import functools
 import logging
 from typing import Callable
 
@@ -10,10 +9,10 @@ from homeassistant.components.climate.const import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfTemperature
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 
 from .const import (
-    API_CLIENT,
+    COORDINATOR,
     DOMAIN,
     PRESET_BOOST,
     PRESET_DEFROST,
@@ -23,8 +22,11 @@ from .const import (
     PRESET_OFF,
     PRESET_PROGRAM_OFF,
     PRESET_PROGRAM_ON,
+    THERMOSTATS,
 )
-from .watts_api import WattsApi
+from .coordinator import WattsVisionCoordinator
+from .device import WattsDevice
+from .entity import WattsVisionEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,9 +36,11 @@ async def async_setup_entry(
 ):
     """Set up the climate platform."""
 
-    wattsClient: WattsApi = hass.data[DOMAIN][API_CLIENT]
+    coordinator: WattsVisionCoordinator = hass.data[DOMAIN][config_entry.entry_id][
+        COORDINATOR
+    ]
 
-    smartHomes = wattsClient.getSmartHomes()
+    smartHomes = coordinator.client.getSmartHomes()
 
     devices = []
 
@@ -48,29 +52,29 @@ async def async_setup_entry(
                         for x in range(len(smartHomes[y]["zones"][z]["devices"])):
                             devices.append(
                                 WattsThermostat(
-                                    wattsClient,
+                                    coordinator,
                                     smartHomes[y]["smarthome_id"],
-                                    smartHomes[y]["zones"][z]["devices"][x]["id"],
-                                    smartHomes[y]["zones"][z]["devices"][x][
-                                        "id_device"
-                                    ],
+                                    smartHomes[y]["zones"][z]["devices"][x].id,
+                                    smartHomes[y]["zones"][z]["devices"][x].id_device,
                                     smartHomes[y]["zones"][z]["zone_label"],
                                 )
                             )
 
-    async_add_entities(devices, update_before_add=True)
+    async_add_entities(devices)
 
 
-class WattsThermostat(ClimateEntity):
+class WattsThermostat(WattsVisionEntity, ClimateEntity):
     """"""
 
     def __init__(
-        self, wattsClient: WattsApi, smartHome: str, id: str, deviceID: str, zone: str
+        self,
+        coordinator: WattsVisionCoordinator,
+        smartHome: str,
+        id: str,
+        deviceID: str,
+        zone: str,
     ):
-        super().__init__()
-        self.client = wattsClient
-        self.smartHome = smartHome
-        self.id = id
+        super().__init__(coordinator, smartHome, id)
         self.zone = zone
         self.deviceID = deviceID
         self._name = "Thermostat " + zone
@@ -82,6 +86,13 @@ class WattsThermostat(ClimateEntity):
         """Return the unique ID for this device."""
         return "watts_thermostat_" + self.id
 
+    @property
+    def _thermostats(self) -> dict:
+        """Thermostats of the config entry, by entity id"""
+        return self.hass.data[DOMAIN][self.platform.config_entry.entry_id][
+            THERMOSTATS
+        ]
+
     @property
     def name(self) -> str:
         """Return the name of the entity."""
@@ -131,70 +142,59 @@ class WattsThermostat(ClimateEntity):
             "via_device": (DOMAIN, self.smartHome),
         }
 
-    async def async_update(self):
-        smartHomeDevice = self.client.getDevice(self.smartHome, self.id)
-
-        self._attr_current_temperature = float(smartHomeDevice["temperature_air"]) / 10
-        if smartHomeDevice["gv_mode"] != "2":
-            self._attr_min_temp = float(smartHomeDevice["min_set_point"]) / 10
-            self._attr_max_temp = float(smartHomeDevice["max_set_point"]) / 10
+    def _update_state(self, smartHomeDevice: WattsDevice) -> None:
+        self._attr_current_temperature = smartHomeDevice.temperature_air
+        if smartHomeDevice.gv_mode != "2":
+            self._attr_min_temp = smartHomeDevice.min_set_point
+            self._attr_max_temp = smartHomeDevice.max_set_point
         else:
             self._attr_min_temp = float(446 / 10)
             self._attr_max_temp = float(446 / 10)
 
-        if smartHomeDevice["heating_up"] == "0":
-            if smartHomeDevice["gv_mode"] == "1":
+        if not smartHomeDevice.heating_up:
+            if smartHomeDevice.gv_mode == "1":
                 self._attr_hvac_action = HVACAction.OFF
             else:
                 self._attr_hvac_action = HVACAction.IDLE
         else:
-            if smartHomeDevice["heat_cool"] == "1":
+            if smartHomeDevice.heat_cool:
                 self._attr_hvac_action = HVACAction.COOLING
             else:
                 self._attr_hvac_action = HVACAction.HEATING
 
-        if smartHomeDevice["heat_cool"] == "1":
+        if smartHomeDevice.heat_cool:
             self._attr_hvac_mode = HVACMode.COOL
         else:
             self._attr_hvac_mode = HVACMode.HEAT
-        self._attr_preset_mode = PRESET_MODE_MAP[smartHomeDevice["gv_mode"]]
+        self._attr_preset_mode = PRESET_MODE_MAP[smartHomeDevice.gv_mode]
 
-        if smartHomeDevice["gv_mode"] == "0":
-            self._attr_target_temperature = (
-                float(smartHomeDevice["consigne_confort"]) / 10
-            )
-        elif smartHomeDevice["gv_mode"] == "1":
+        if smartHomeDevice.gv_mode == "1":
             self._attr_hvac_mode = HVACMode.OFF
             self._attr_target_temperature = None
-        elif smartHomeDevice["gv_mode"] == "2":
-            self._attr_target_temperature = float(smartHomeDevice["consigne_hg"]) / 10
-        elif smartHomeDevice["gv_mode"] == "3":
-            self._attr_target_temperature = float(smartHomeDevice["consigne_eco"]) / 10
-        elif smartHomeDevice["gv_mode"] == "4":
-            self._attr_target_temperature = (
-                float(smartHomeDevice["consigne_boost"]) / 10
-            )
-        elif smartHomeDevice["gv_mode"] == "11":
-            self._attr_target_temperature = (
-                float(smartHomeDevice["consigne_manuel"]) / 10
-            )
-
-        self._attr_extra_state_attributes["consigne_confort"] = (
-            float(smartHomeDevice["consigne_confort"]) / 10
-        )
-        self._attr_extra_state_attributes["consigne_hg"] = (
-            float(smartHomeDevice["consigne_hg"]) / 10
-        )
-        self._attr_extra_state_attributes["consigne_eco"] = (
-            float(smartHomeDevice["consigne_eco"]) / 10
-        )
-        self._attr_extra_state_attributes["consigne_boost"] = (
-            float(smartHomeDevice["consigne_boost"]) / 10
-        )
-        self._attr_extra_state_attributes["consigne_manuel"] = (
-            float(smartHomeDevice["consigne_manuel"]) / 10
-        )
-        self._attr_extra_state_attributes["gv_mode"] = smartHomeDevice["gv_mode"]
+        elif smartHomeDevice.setpoint is not None:
+            self._attr_target_temperature = smartHomeDevice.setpoint
+
+        self._attr_extra_state_attributes[
+            "consigne_confort"
+        ] = smartHomeDevice.consigne_confort
+        self._attr_extra_state_attributes["consigne_hg"] = smartHomeDevice.consigne_hg
+        self._attr_extra_state_attributes["consigne_eco"] = smartHomeDevice.consigne_eco
+        self._attr_extra_state_attributes[
+            "consigne_boost"
+        ] = smartHomeDevice.consigne_boost
+        self._attr_extra_state_attributes[
+            "consigne_manuel"
+        ] = smartHomeDevice.consigne_manuel
+        self._attr_extra_state_attributes["gv_mode"] = smartHomeDevice.gv_mode
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        # Make the entity available to the bulk services
+        self._thermostats[self.entity_id] = self
+
+    async def async_will_remove_from_hass(self) -> None:
+        self._thermostats.pop(self.entity_id, None)
+        await super().async_will_remove_from_hass()
 
     async def async_set_hvac_mode(self, hvac_mode):
         """Set new target hvac mode."""
@@ -217,109 +217,51 @@ class WattsThermostat(ClimateEntity):
                     int(self._attr_extra_state_attributes["consigne_manuel"] * 10)
                 )
 
-            # reloading the devices may take some time, meanwhile set the new values manually
-            for y in range(len(self.client._smartHomeData)):
-                if self.client._smartHomeData[y]["smarthome_id"] == self.smartHome:
-                    for z in range(len(self.client._smartHomeData[y]["zones"])):
-                        for x in range(
-                            len(self.client._smartHomeData[y]["zones"][z]["devices"])
-                        ):
-                            if (
-                                self.client._smartHomeData[y]["zones"][z]["devices"][x][
-                                    "id"
-                                ]
-                                == self.id
-                            ):
-                                self.client._smartHomeData[y]["zones"][z]["devices"][x][
-                                    "gv_mode"
-                                ] = self._attr_extra_state_attributes[
-                                    "previous_gv_mode"
-                                ]
-                                self.client._smartHomeData[y]["zones"][z]["devices"][x][
-                                    "consigne_manuel"
-                                ] = value
-                                if (
-                                    self._attr_extra_state_attributes[
-                                        "previous_gv_mode"
-                                    ]
-                                    == "0"
-                                ):
-                                    self._attr_extra_state_attributes[
-                                        "consigne_confort"
-                                    ] = value
-                                elif (
-                                    self._attr_extra_state_attributes[
-                                        "previous_gv_mode"
-                                    ]
-                                    == "2"
-                                ):
-                                    self._attr_extra_state_attributes[
-                                        "consigne_hg"
-                                    ] = value
-                                elif (
-                                    self._attr_extra_state_attributes[
-                                        "previous_gv_mode"
-                                    ]
-                                    == "3"
-                                ):
-                                    self._attr_extra_state_attributes[
-                                        "consigne_eco"
-                                    ] = value
-                                elif (
-                                    self._attr_extra_state_attributes[
-                                        "previous_gv_mode"
-                                    ]
-                                    == "4"
-                                ):
-                                    self._attr_extra_state_attributes[
-                                        "consigne_boost"
-                                    ] = value
-
-            func = functools.partial(
-                self.client.pushTemperature,
-                self.smartHome,
-                self.deviceID,
-                value,
-                self._attr_extra_state_attributes["previous_gv_mode"],
-            )
-            await self.hass.async_add_executor_job(func)
+            gvMode = self._attr_extra_state_attributes["previous_gv_mode"]
+            self.client.addPendingWrite(self.smartHome, self.deviceID, value, gvMode)
+            self.coordinator.async_update_listeners()
+
+            await self._async_push(value, gvMode)
 
         if hvac_mode == HVACMode.OFF:
             self._attr_extra_state_attributes[
                 "previous_gv_mode"
             ] = self._attr_extra_state_attributes["gv_mode"]
 
-            # reloading the devices may take some time, meanwhile set the new values manually
-            for y in range(len(self.client._smartHomeData)):
-                if self.client._smartHomeData[y]["smarthome_id"] == self.smartHome:
-                    for z in range(len(self.client._smartHomeData[y]["zones"])):
-                        for x in range(
-                            len(self.client._smartHomeData[y]["zones"][z]["devices"])
-                        ):
-                            if (
-                                self.client._smartHomeData[y]["zones"][z]["devices"][x][
-                                    "id"
-                                ]
-                                == self.id
-                            ):
-                                self.client._smartHomeData[y]["zones"][z]["devices"][x][
-                                    "gv_mode"
-                                ] = PRESET_MODE_REVERSE_MAP[PRESET_OFF]
-                                self.client._smartHomeData[y]["zones"][z]["devices"][x][
-                                    "consigne_manuel"
-                                ] = "0"
-
-            func = functools.partial(
-                self.client.pushTemperature,
-                self.smartHome,
-                self.deviceID,
-                "0",
-                PRESET_MODE_REVERSE_MAP[PRESET_OFF],
-            )
-            await self.hass.async_add_executor_job(func)
+            gvMode = PRESET_MODE_REVERSE_MAP[PRESET_OFF]
+            self.client.addPendingWrite(self.smartHome, self.deviceID, "0", gvMode)
+            self.coordinator.async_update_listeners()
+
+            await self._async_push("0", gvMode)
 
     async def async_set_preset_mode(self, preset_mode):
         """Set new target preset mode."""
+        value, gvMode = self.apply_preset_mode(preset_mode)
+        self.coordinator.async_update_listeners()
+
+        await self._async_push(value, gvMode)
+
+    async def async_set_temperature(self, **kwargs):
+        """Set new target temperature."""
+        value, gvMode = self.apply_temperature(kwargs["temperature"])
+        self.coordinator.async_update_listeners()
+
+        await self._async_push(value, gvMode)
+
+    async def _async_push(self, value: str, gvMode: str) -> None:
+        """Push the new state and poll until the cloud reports it."""
+        try:
+            await self.client.queuePushTemperature(
+                self.smartHome, self.deviceID, value, gvMode
+            )
+        finally:
+            # A failed push dropped its pending write, show the loaded values
+            self.coordinator.async_update_listeners()
+            self.coordinator.async_poll_pending_writes()
+
+    @callback
+    def apply_preset_mode(self, preset_mode: str) -> tuple[str, str]:
+        """Optimistically apply a preset mode, returns the value and mode to push."""
         value = 0
         if preset_mode != PRESET_OFF:
             if preset_mode == PRESET_DEFROST:
@@ -343,52 +285,22 @@ class WattsThermostat(ClimateEntity):
                 "previous_gv_mode"
             ] = self._attr_extra_state_attributes["gv_mode"]
 
-        # reloading the devices may take some time, meanwhile set the new values manually
-        for y in range(len(self.client._smartHomeData)):
-            if self.client._smartHomeData[y]["smarthome_id"] == self.smartHome:
-                for z in range(len(self.client._smartHomeData[y]["zones"])):
-                    for x in range(
-                        len(self.client._smartHomeData[y]["zones"][z]["devices"])
-                    ):
-                        if (
-                            self.client._smartHomeData[y]["zones"][z]["devices"][x][
-                                "id"
-                            ]
-                            == self.id
-                        ):
-                            self.client._smartHomeData[y]["zones"][z]["devices"][x][
-                                "gv_mode"
-                            ] = PRESET_MODE_REVERSE_MAP[preset_mode]
-                            self.client._smartHomeData[y]["zones"][z]["devices"][x][
-                                "consigne_manuel"
-                            ] = value
-
-        func = functools.partial(
-            self.client.pushTemperature,
-            self.smartHome,
-            self.deviceID,
-            value,
-            PRESET_MODE_REVERSE_MAP[preset_mode],
-        )
-        await self.hass.async_add_executor_job(func)
+        # Reloading the devices may take some time, meanwhile show the new values
+        gvMode = PRESET_MODE_REVERSE_MAP[preset_mode]
+        self.client.addPendingWrite(self.smartHome, self.deviceID, value, gvMode)
 
-    async def async_set_temperature(self, **kwargs):
-        """Set new target temperature."""
-        value = str(int(kwargs["temperature"] * 10))
-        gvMode = PRESET_MODE_REVERSE_MAP[self._attr_preset_mode]
+        return value, gvMode
 
-        # Get the smartHomeDevice
-        smartHomeDevice = self.client.getDevice(self.smartHome, self.id)
+    @callback
+    def apply_temperature(
+        self, temperature: float, gvMode: str | None = None
+    ) -> tuple[str, str]:
+        """Optimistically apply a target temperature, returns the value and mode to push."""
+        value = str(int(temperature * 10))
+        if gvMode is None:
+            gvMode = PRESET_MODE_REVERSE_MAP[self._attr_preset_mode]
 
-        # update its temp settings
-        smartHomeDevice["consigne_manuel"] = value
-        smartHomeDevice["consigne_confort"] = value
-
-        # Set the smartHomeDevice using the just altered SmartHomeDevice
-        self.client.setDevice(self.smartHome, self.id, smartHomeDevice)
-
-        func = functools.partial(
-            self.client.pushTemperature, self.smartHome, self.deviceID, value, gvMode
-        )
+        # Reloading the devices may take some time, meanwhile show the new values
+        self.client.addPendingWrite(self.smartHome, self.deviceID, value, gvMode)
 
-        await self.hass.async_add_executor_job(func)
+        return value, gvMode
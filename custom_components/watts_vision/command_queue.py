@@ -0,0 +1,89 @@
+"""Debounced command queue for the Watts Vision thermostats."""
+import asyncio
+from contextlib import suppress
+import logging
+from typing import Awaitable, Callable
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _PendingCommand:
+    """Latest command waiting to be sent for a device."""
+
+    def __init__(self, future: asyncio.Future, value: str, gvMode: str):
+        self.future = future
+        self.value = value
+        self.gvMode = gvMode
+        self.task: asyncio.Task | None = None
+
+
+class WattsCommandQueue:
+    """Coalesce bursts of pushes per device, only sending the last one.
+
+    The first push for a device opens a window of ``delay`` seconds. Pushes for
+    the same device within that window replace the pending command, and every
+    caller gets the result of the single push that is sent when it closes.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        push: Callable[[str, str, str, str], Awaitable[bool]],
+        delay: float,
+    ):
+        self._hass = hass
+        self._push = push
+        self._delay = delay
+        self._pending: dict[tuple[str, str], _PendingCommand] = {}
+        self._flush = asyncio.Event()
+        self.merged = 0
+
+    async def async_push(
+        self, smarthome: str, deviceID: str, value: str, gvMode: str
+    ) -> bool:
+        """Queue a push for the device and wait for it to be sent."""
+        key = (smarthome, deviceID)
+
+        if (pending := self._pending.get(key)) is not None:
+            pending.value = value
+            pending.gvMode = gvMode
+            self.merged += 1
+            _LOGGER.debug(
+                "Merged push for device %s, %s merged so far", deviceID, self.merged
+            )
+        else:
+            pending = _PendingCommand(self._hass.loop.create_future(), value, gvMode)
+            pending.task = self._hass.async_create_task(
+                self._async_send_later(key, pending)
+            )
+            self._pending[key] = pending
+
+        return await asyncio.shield(pending.future)
+
+    async def async_flush(self) -> None:
+        """Send all pending commands right away."""
+        tasks = [pending.task for pending in self._pending.values()]
+        if not tasks:
+            return
+
+        self._flush.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._flush.clear()
+
+    async def _async_send_later(
+        self, key: tuple[str, str], pending: _PendingCommand
+    ) -> None:
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._flush.wait(), self._delay)
+
+        # Pushes arriving from now on open a new window
+        del self._pending[key]
+
+        try:
+            result = await self._push(*key, pending.value, pending.gvMode)
+        except Exception as exception:  # pylint: disable=broad-except
+            pending.future.set_exception(exception)
+        else:
+            pending.future.set_result(result)
@@ -1,9 +1,11 @@
 """
 Config flow for Watts Vision integration.
 """
+import asyncio
 import logging
 from typing import Any
 
+from aiohttp import ClientError
 from homeassistant import config_entries
 from homeassistant.config_entries import CONN_CLASS_CLOUD_POLL, ConfigFlow
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
@@ -11,7 +13,24 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 import voluptuous as vol
 
-from .const import DOMAIN
+from .const import (
+    CONF_COMMAND_DELAY,
+    CONF_KEEP_RAW,
+    CONF_LAST_COMMUNICATION_INTERVAL,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_IN_FLIGHT,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    DEFAULT_COMMAND_DELAY,
+    DEFAULT_KEEP_RAW,
+    DEFAULT_LAST_COMMUNICATION_INTERVAL,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DOMAIN,
+)
+from .handover import async_store_session
 from .watts_api import WattsApi
 
 CONFIG_SCHEMA = vol.Schema(
@@ -36,7 +55,19 @@ async def validate_input(
 
     api = WattsApi(hass, data[CONF_USERNAME], data[CONF_PASSWORD])
 
-    authenticated = await hass.async_add_executor_job(api.test_authentication)
+    try:
+        authenticated = await api.test_authentication()
+        if authenticated:
+            # Load the smart homes while logged in, the entry setup continues
+            # with them instead of logging in and loading them again.
+            smarthomes = None
+            try:
+                smarthomes = await api.loadSmartHomes()
+            except (ClientError, asyncio.TimeoutError) as exception:
+                _LOGGER.debug(f"Loading the smart homes failed: {exception}")
+            async_store_session(hass, data, api.exportSession(smarthomes))
+    finally:
+        await api.close()
 
     # If authentication fails, raise an exception.
     if not authenticated:
@@ -92,6 +123,10 @@ class UsernameExists(HomeAssistantError):
     """Error to indicate the username already exists."""
 
 
+class InvalidScanInterval(HomeAssistantError):
+    """Error to indicate the minimum scan interval exceeds the maximum."""
+
+
 class OptionsFlowHandler(config_entries.OptionsFlow):
     """Handle options flow for the Watts Vision integration."""
 
@@ -104,6 +139,9 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         updated = None
         if user_input is not None:
             try:
+                if user_input[CONF_MIN_SCAN_INTERVAL] > user_input[CONF_MAX_SCAN_INTERVAL]:
+                    raise InvalidScanInterval
+
                 _LOGGER.debug("Validate input")
                 validated_data = await validate_input(
                     self.hass, user_input, self.config_entry.data
@@ -114,7 +152,24 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 updated = self.hass.config_entries.async_update_entry(
                     self.config_entry,
                     title=str(user_input["username"]),
-                    data=validated_data,
+                    data={
+                        **self.config_entry.data,
+                        CONF_USERNAME: validated_data[CONF_USERNAME],
+                        CONF_PASSWORD: validated_data[CONF_PASSWORD],
+                    },
+                    options={
+                        CONF_MAX_CONCURRENT_REQUESTS: validated_data[
+                            CONF_MAX_CONCURRENT_REQUESTS
+                        ],
+                        CONF_MAX_IN_FLIGHT: validated_data[CONF_MAX_IN_FLIGHT],
+                        CONF_COMMAND_DELAY: validated_data[CONF_COMMAND_DELAY],
+                        CONF_MIN_SCAN_INTERVAL: validated_data[CONF_MIN_SCAN_INTERVAL],
+                        CONF_MAX_SCAN_INTERVAL: validated_data[CONF_MAX_SCAN_INTERVAL],
+                        CONF_LAST_COMMUNICATION_INTERVAL: validated_data[
+                            CONF_LAST_COMMUNICATION_INTERVAL
+                        ],
+                        CONF_KEEP_RAW: validated_data[CONF_KEEP_RAW],
+                    },
                 )
                 if updated:
                     # Reload entry
@@ -127,6 +182,8 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 errors["base"] = "invalid_auth"
             except UsernameExists:
                 errors["base"] = "username_exists"
+            except InvalidScanInterval:
+                errors["base"] = "invalid_scan_interval"
             except Exception:  # pylint: disable=broad-except
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
@@ -143,6 +200,50 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                         default=str(self.config_entry.data[CONF_USERNAME]),
                     ): str,
                     vol.Required(CONF_PASSWORD): str,
+                    vol.Required(
+                        CONF_MAX_CONCURRENT_REQUESTS,
+                        default=self.config_entry.options.get(
+                            CONF_MAX_CONCURRENT_REQUESTS,
+                            DEFAULT_MAX_CONCURRENT_REQUESTS,
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+                    vol.Required(
+                        CONF_MAX_IN_FLIGHT,
+                        default=self.config_entry.options.get(
+                            CONF_MAX_IN_FLIGHT, DEFAULT_MAX_IN_FLIGHT
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=32)),
+                    vol.Required(
+                        CONF_COMMAND_DELAY,
+                        default=self.config_entry.options.get(
+                            CONF_COMMAND_DELAY, DEFAULT_COMMAND_DELAY
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+                    vol.Required(
+                        CONF_MIN_SCAN_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=30, max=3600)),
+                    vol.Required(
+                        CONF_MAX_SCAN_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=30, max=3600)),
+                    vol.Required(
+                        CONF_LAST_COMMUNICATION_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_LAST_COMMUNICATION_INTERVAL,
+                            DEFAULT_LAST_COMMUNICATION_INTERVAL,
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=30, max=86400)),
+                    vol.Required(
+                        CONF_KEEP_RAW,
+                        default=self.config_entry.options.get(
+                            CONF_KEEP_RAW, DEFAULT_KEEP_RAW
+                        ),
+                    ): bool,
                 }
             ),
             errors=errors,
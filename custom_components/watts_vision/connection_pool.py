@@ -0,0 +1,65 @@
+"""Connection pool shared by the Watts Vision accounts of a Home Assistant instance."""
+import asyncio
+import logging
+
+from aiohttp import ClientSession, ClientTimeout
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+
+from .const import DOMAIN, GLOBAL_MAX_CONCURRENT_REQUESTS, POOL, REQUEST_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def pooled_session(hass: HomeAssistant) -> ClientSession:
+    """Create a session on the connection pool of Home Assistant.
+
+    The session is not tied to the config entry being set up, as it may outlive
+    it. Release it with detach, which leaves the shared connections open.
+    """
+    return async_create_clientsession(
+        hass, auto_cleanup=False, timeout=ClientTimeout(total=REQUEST_TIMEOUT)
+    )
+
+
+class WattsConnectionPool:
+    """Pooled session and global request limit shared by every config entry.
+
+    All accounts talk to the same auth and api hosts, so they share the
+    connections (and their TLS handshakes) of Home Assistant's pool and at most
+    ``max_concurrent_requests`` requests are in flight over all accounts together.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_concurrent_requests: int = GLOBAL_MAX_CONCURRENT_REQUESTS,
+    ):
+        self.session = pooled_session(hass)
+        self.limit = asyncio.Semaphore(max_concurrent_requests)
+        self.entries: set[str] = set()
+
+
+def async_acquire_pool(hass: HomeAssistant, entry_id: str) -> WattsConnectionPool:
+    """Get the shared pool for a config entry, creating it for the first one."""
+    pool: WattsConnectionPool | None = hass.data[DOMAIN].get(POOL)
+    if pool is None:
+        pool = hass.data[DOMAIN][POOL] = WattsConnectionPool(hass)
+
+    pool.entries.add(entry_id)
+    return pool
+
+
+@callback
+def async_release_pool(hass: HomeAssistant, entry_id: str) -> None:
+    """Stop using the shared pool, releasing it once no config entry uses it."""
+    pool: WattsConnectionPool | None = hass.data[DOMAIN].get(POOL)
+    if pool is None:
+        return
+
+    pool.entries.discard(entry_id)
+    if not pool.entries:
+        _LOGGER.debug("Releasing the shared connection pool")
+        hass.data[DOMAIN].pop(POOL)
+        pool.session.detach()
@@ -6,10 +6,76 @@ from homeassistant.components.climate.const import (
     PRESET_ECO,
 )
 
+AUTH_URL = "https://auth.smarthome.wattselectronics.com/realms/watts/protocol/openid-connect/token"
+API_URL = "https://smarthome.wattselectronics.com/api/v0.1/human"
+
+# Entry data to use other URLs than AUTH_URL and API_URL, not set by the config
+# flow but handy to run against a stand-in of the cloud
+CONF_AUTH_URL = "auth_url"
+CONF_API_URL = "api_url"
+
+# Keys of the per config entry data in hass.data[DOMAIN][entry_id]
 API_CLIENT = "api"
+COORDINATOR = "coordinator"
+THERMOSTATS = "thermostats"
+# Key of the connection pool shared by all config entries in hass.data[DOMAIN]
+POOL = "pool"
+# Key of the sessions the config and options flows hand over to the entry setup
+# in hass.data[DOMAIN], and the seconds they may be used for
+HANDOVER = "handover"
+HANDOVER_TIMEOUT = 60
+
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+# Requests of an account in flight at once, logins included, over the shared
+# connections. It keeps its former pool_size key, so saved options still apply.
+CONF_MAX_IN_FLIGHT = "pool_size"
+DEFAULT_MAX_IN_FLIGHT = 8
+CONF_COMMAND_DELAY = "command_delay"
+DEFAULT_COMMAND_DELAY = 1.0
+
+# Requests in flight over all accounts together
+GLOBAL_MAX_CONCURRENT_REQUESTS = 16
+
+# Seconds a request may take
+REQUEST_TIMEOUT = 30
+
+# Requests per second per account, on average and in a burst
+RATE_LIMIT_RATE = 2.0
+RATE_LIMIT_BURST = 20
+
+# Throttled (429) and failing (5xx) requests are tried RETRY_MAX_ATTEMPTS times,
+# backing off from RETRY_BACKOFF_BASE up to RETRY_BACKOFF_MAX seconds
+RETRY_MAX_ATTEMPTS = 4
+RETRY_BACKOFF_BASE = 1
+RETRY_BACKOFF_MAX = 60
+
+# Endpoints with latency statistics, by the name the statistics use
+ENDPOINTS = {
+    "openid-connect/token": "Token",
+    "user/read": "User read",
+    "smarthome/read": "Smarthome read",
+    "query/push": "Push",
+    "sandbox/check_last_connexion": "Last communication",
+}
+# Number of recent requests per endpoint the latency percentiles are taken from
+LATENCY_WINDOW = 500
+
+# Seconds before expiry at which the access token is renewed in the background
+TOKEN_RENEW_MARGIN = 30
 
 DOMAIN = "watts_vision"
 
+# Circuit breaker states, fired as EVENT_CIRCUIT_BREAKER on every transition.
+# The circuit opens after CIRCUIT_FAILURE_THRESHOLD failed requests in a row and
+# lets a probe through CIRCUIT_RESET_TIMEOUT seconds later.
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 60
+EVENT_CIRCUIT_BREAKER = f"{DOMAIN}_circuit_breaker"
+
 PRESET_DEFROST = "Frost Protection"
 PRESET_OFF = "Off"
 PRESET_PROGRAM_ON = "Program on"
@@ -35,8 +101,64 @@ PRESET_MODE_REVERSE_MAP = {
     PRESET_PROGRAM_OFF: "11",
 }
 
+# Setpoint field read in the given gv_mode, modes without one (off) are missing.
+# A push in the mode changes that field too, except in the program mode: it runs
+# on the manual setpoint, but switching it on only sends the mode.
+PRESET_SETPOINT_FIELD = {
+    "0": "consigne_confort",
+    "2": "consigne_hg",
+    "3": "consigne_eco",
+    "4": "consigne_boost",
+    "8": "consigne_manuel",
+    "11": "consigne_manuel",
+}
+
+# Fields of the user/read smart homes and smarthome/read zones the platforms
+# read, the others are dropped when loading
+SMARTHOME_FIELDS = ("smarthome_id", "label", "mac_address")
+ZONE_FIELDS = ("zone_label",)
+
+# Option keeping the unprojected API data as well, for the diagnostics
+CONF_KEEP_RAW = "keep_raw"
+DEFAULT_KEEP_RAW = False
+
+# Device fields the platforms read, a device is only updated when one changes
+DEVICE_FIELDS = (
+    "temperature_air",
+    "gv_mode",
+    "heating_up",
+    "heat_cool",
+    "min_set_point",
+    "max_set_point",
+    "consigne_confort",
+    "consigne_hg",
+    "consigne_eco",
+    "consigne_boost",
+    "consigne_manuel",
+    "error_code",
+)
+
 SCAN_INTERVAL = timedelta(seconds=120)
 
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+DEFAULT_MIN_SCAN_INTERVAL = int(SCAN_INTERVAL.total_seconds())
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+DEFAULT_MAX_SCAN_INTERVAL = 600
+
+# The last communication of the central units is fetched with the devices, at
+# most once every CONF_LAST_COMMUNICATION_INTERVAL seconds
+CONF_LAST_COMMUNICATION_INTERVAL = "last_communication_interval"
+DEFAULT_LAST_COMMUNICATION_INTERVAL = int(SCAN_INTERVAL.total_seconds())
+
+# A smart home is only reloaded when its central unit communicated later than
+# LAST_CONTACT_MARGIN seconds before its previous load
+LAST_CONTACT_MARGIN = 5
+
+# After a push the affected smart homes are polled every PUSH_CONFIRM_INTERVAL
+# seconds until the cloud reports the new values, for at most PUSH_CONFIRM_TIMEOUT
+PUSH_CONFIRM_INTERVAL = 10
+PUSH_CONFIRM_TIMEOUT = 120
+
 NO_ISSUES = "No issues"
 DEF_BAT_TH = "Battery failure"
 
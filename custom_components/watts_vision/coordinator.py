@@ -0,0 +1,179 @@
+"""Watts Vision data update coordinator."""
+import asyncio
+from datetime import timedelta
+import logging
+from time import monotonic
+
+from aiohttp import ClientError
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_OPEN,
+    CIRCUIT_RESET_TIMEOUT,
+    DEFAULT_LAST_COMMUNICATION_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEVICE_FIELDS,
+    DOMAIN,
+    PUSH_CONFIRM_INTERVAL,
+)
+from .snapshot import STORAGE_SAVE_DELAY, dump_smarthomes
+from .token_manager import AuthenticationFailed
+from .watts_api import WattsApi
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WattsVisionCoordinator(DataUpdateCoordinator):
+    """Fetch the smart homes once per cycle and notify all entities.
+
+    The interval starts at ``min_interval`` and doubles, up to ``max_interval``,
+    for every refresh that returns the same data. While pushed commands are not
+    yet reported back by the cloud, only the affected smart homes are polled
+    every PUSH_CONFIRM_INTERVAL seconds. The last communication of the central
+    units is fetched with a full refresh once ``last_communication_interval``
+    seconds have passed.
+
+    Listeners are only meant to write their state when the DEVICE_FIELDS of
+    their device are in ``changed_devices``.
+
+    ``circuit_state`` follows the client's circuit breaker, while it is open
+    the refreshes are the breaker's probes.
+
+    Full refreshes that changed the smart homes are saved to ``snapshots``. While
+    the data comes from a snapshot instead of the cloud, ``stale`` is set.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: WattsApi,
+        min_interval: int = DEFAULT_MIN_SCAN_INTERVAL,
+        max_interval: int = DEFAULT_MAX_SCAN_INTERVAL,
+        snapshots: Store | None = None,
+        last_communication_interval: int = DEFAULT_LAST_COMMUNICATION_INTERVAL,
+    ):
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=timedelta(seconds=min_interval),
+        )
+        self.client = client
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._interval = min_interval
+        self._next_full_refresh = monotonic() + min_interval
+        self._last_communication_interval = last_communication_interval
+        self._next_last_communication = 0
+        self._snapshots = snapshots
+        self._fingerprints = {}
+        self._notified = None
+        self.changed_devices = set()
+        self.suppressed_writes = 0
+        self.stale = False
+        self.setup_duration = None
+        self.circuit_state = CIRCUIT_CLOSED
+
+    @callback
+    def async_save_snapshot(self) -> None:
+        """Save the current smart home tree once no refresh follows shortly."""
+        if self._snapshots is not None:
+            self._snapshots.async_delay_save(
+                lambda: dump_smarthomes(self.client.getSmartHomes()),
+                STORAGE_SAVE_DELAY,
+            )
+
+    @callback
+    def async_circuit_changed(self, state: str, previous: str) -> None:
+        """Update the entities' availability for the new circuit breaker state."""
+        self.circuit_state = state
+        if state == CIRCUIT_OPEN:
+            # Probe as soon as the breaker lets a request through again
+            self.update_interval = timedelta(seconds=CIRCUIT_RESET_TIMEOUT)
+        self.async_update_listeners()
+
+    @callback
+    def async_poll_pending_writes(self) -> None:
+        """Poll for the pushed values from PUSH_CONFIRM_INTERVAL seconds on."""
+        if (
+            not self.client.unconfirmedSmartHomes()
+            or self.update_interval.total_seconds() <= PUSH_CONFIRM_INTERVAL
+        ):
+            return
+
+        self.update_interval = timedelta(seconds=PUSH_CONFIRM_INTERVAL)
+        self._schedule_refresh()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Work out which devices changed since the last time and notify."""
+        fingerprints = {
+            (smarthome, deviceId): tuple(getattr(device, field) for field in DEVICE_FIELDS)
+            for smarthome, deviceId, device in self.client.iterDevices()
+        }
+
+        notified = (self.last_update_success, self.stale, self.circuit_state)
+        if notified != self._notified:
+            # Availability changed, every entity has to write its state
+            self.changed_devices = set(fingerprints) | set(self._fingerprints)
+        else:
+            self.changed_devices = {
+                key
+                for key in set(fingerprints) | set(self._fingerprints)
+                if fingerprints.get(key) != self._fingerprints.get(key)
+            }
+
+        self._fingerprints = fingerprints
+        self._notified = notified
+
+        super().async_update_listeners()
+
+    async def _async_update_data(self):
+        unconfirmed = self.client.unconfirmedSmartHomes()
+        full_refresh = not unconfirmed or monotonic() >= self._next_full_refresh
+        lastCommunication = (
+            full_refresh and monotonic() >= self._next_last_communication
+        )
+        previous = self.client.getSmartHomes()
+
+        try:
+            if self.stale or not self.client.getSmartHomes():
+                # First load, or pick up smart homes added since the snapshot
+                loaded = await self.client.loadData(lastCommunication)
+            else:
+                loaded = await self.client.reloadDevices(
+                    None if full_refresh else unconfirmed, lastCommunication
+                )
+        except (AuthenticationFailed, ClientError, asyncio.TimeoutError) as exception:
+            raise UpdateFailed(f"Error reloading devices: {exception}") from exception
+
+        if not loaded:
+            # Retry instead of taking (and saving) a partial tree as the state
+            raise UpdateFailed("The Watts Vision API returned an error")
+
+        if full_refresh:
+            if self.client.getSmartHomes() == previous:
+                self._interval = min(self._interval * 2, self._max_interval)
+            else:
+                self._interval = self._min_interval
+                self.async_save_snapshot()
+            self._next_full_refresh = monotonic() + self._interval
+            self.stale = False
+
+        if lastCommunication:
+            self._next_last_communication = (
+                monotonic() + self._last_communication_interval
+            )
+
+        interval = max(self._next_full_refresh - monotonic(), 1)
+        if self.client.unconfirmedSmartHomes():
+            interval = min(interval, PUSH_CONFIRM_INTERVAL)
+
+        self.update_interval = timedelta(seconds=interval)
+        _LOGGER.debug("Next refresh in %.0f seconds", interval)
+
+        return self.client.getSmartHomes()
@@ -0,0 +1,130 @@
+"""Typed model of the Watts Vision devices."""
+from __future__ import annotations
+
+from .const import PRESET_SETPOINT_FIELD, ZONE_FIELDS
+
+
+def tenths(value) -> float:
+    """Scale a temperature in tenths of a degree, as sent by the API, to degrees"""
+    return float(value) / 10
+
+
+class WattsDevice:
+    """A thermostat as reported by smarthome/read, parsed once per refresh.
+
+    Temperatures are in degrees Fahrenheit, ``gv_mode`` keeps the API's mode
+    code so it can be looked up in PRESET_MODE_MAP.
+    """
+
+    __slots__ = (
+        "id",
+        "id_device",
+        "temperature_air",
+        "gv_mode",
+        "heating_up",
+        "heat_cool",
+        "min_set_point",
+        "max_set_point",
+        "consigne_confort",
+        "consigne_hg",
+        "consigne_eco",
+        "consigne_boost",
+        "consigne_manuel",
+        "error_code",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        id_device: str,
+        temperature_air: float | None = None,
+        gv_mode: str = "0",
+        heating_up: bool = False,
+        heat_cool: bool = False,
+        min_set_point: float | None = None,
+        max_set_point: float | None = None,
+        consigne_confort: float | None = None,
+        consigne_hg: float | None = None,
+        consigne_eco: float | None = None,
+        consigne_boost: float | None = None,
+        consigne_manuel: float | None = None,
+        error_code: int = 0,
+    ):
+        self.id = id
+        self.id_device = id_device
+        self.temperature_air = temperature_air
+        self.gv_mode = gv_mode
+        self.heating_up = heating_up
+        # True when the device is cooling instead of heating
+        self.heat_cool = heat_cool
+        self.min_set_point = min_set_point
+        self.max_set_point = max_set_point
+        self.consigne_confort = consigne_confort
+        self.consigne_hg = consigne_hg
+        self.consigne_eco = consigne_eco
+        self.consigne_boost = consigne_boost
+        self.consigne_manuel = consigne_manuel
+        self.error_code = error_code
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> WattsDevice:
+        """Parse a device of the smarthome/read response"""
+        return cls(
+            payload["id"],
+            payload["id_device"],
+            temperature_air=tenths(payload["temperature_air"]),
+            gv_mode=payload["gv_mode"],
+            heating_up=payload["heating_up"] != "0",
+            heat_cool=payload["heat_cool"] == "1",
+            min_set_point=tenths(payload["min_set_point"]),
+            max_set_point=tenths(payload["max_set_point"]),
+            consigne_confort=tenths(payload["consigne_confort"]),
+            consigne_hg=tenths(payload["consigne_hg"]),
+            consigne_eco=tenths(payload["consigne_eco"]),
+            consigne_boost=tenths(payload["consigne_boost"]),
+            consigne_manuel=tenths(payload["consigne_manuel"]),
+            error_code=int(payload["error_code"]),
+        )
+
+    def as_dict(self) -> dict:
+        """Return the fields as a dict, the keyword arguments of the constructor"""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    @property
+    def setpoint(self) -> float | None:
+        """Set point of the active mode, None when the device is off"""
+        field = PRESET_SETPOINT_FIELD.get(self.gv_mode)
+        return None if field is None else getattr(self, field)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, WattsDevice):
+            return NotImplemented
+        return all(
+            getattr(self, field) == getattr(other, field) for field in self.__slots__
+        )
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"WattsDevice({self.id!r}, gv_mode={self.gv_mode!r})"
+
+
+def project(payload: dict, fields: tuple[str, ...]) -> dict:
+    """Keep only the given fields of a payload"""
+    return {field: payload[field] for field in fields if field in payload}
+
+
+def parse_zones(zones: list | None) -> list | None:
+    """Keep the zone fields the platforms read and parse their devices"""
+    if zones is None:
+        return None
+
+    return [
+        {
+            **project(zone, ZONE_FIELDS),
+            "devices": None
+            if zone.get("devices") is None
+            else [WattsDevice.from_payload(device) for device in zone["devices"]],
+        }
+        for zone in zones
+    ]
@@ -0,0 +1,113 @@
+"""Watts Vision sensor platform -- diagnostic sensors of an account."""
+from typing import Optional
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN
+from .coordinator import WattsVisionCoordinator
+from .watts_api import WattsApi
+
+
+class WattsVisionCircuitBreakerSensor(SensorEntity):
+    """State of the circuit breaker guarding the requests of an account."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = False
+
+    def __init__(self, wattsClient: WattsApi, config_entry: ConfigEntry):
+        self.client = wattsClient
+        self._entry_id = config_entry.entry_id
+        self._name = "Circuit breaker " + config_entry.title
+
+    @property
+    def unique_id(self) -> str:
+        """Return the unique ID of the sensor."""
+        return "circuit_breaker_" + self._entry_id
+
+    @property
+    def name(self) -> str:
+        """Return the name of the entity."""
+        return self._name
+
+    @property
+    def state(self) -> Optional[str]:
+        return self.client.circuitBreaker.state
+
+    @property
+    def device_class(self):
+        return SensorDeviceClass.ENUM
+
+    @property
+    def options(self):
+        return [CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN]
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(
+            self.client.circuitBreaker.add_listener(self._circuit_changed)
+        )
+
+    @callback
+    def _circuit_changed(self, state: str, previous: str) -> None:
+        self.async_write_ha_state()
+
+
+class WattsVisionLatencySensor(CoordinatorEntity[WattsVisionCoordinator], SensorEntity):
+    """95th percentile latency of an endpoint, updated with every refresh."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        coordinator: WattsVisionCoordinator,
+        config_entry: ConfigEntry,
+        endpoint: str,
+        label: str,
+    ):
+        super().__init__(coordinator)
+        self.client = coordinator.client
+        self.endpoint = endpoint
+        self._entry_id = config_entry.entry_id
+        self._name = f"Latency {label} {config_entry.title}"
+
+    @property
+    def unique_id(self) -> str:
+        """Return the unique ID of the sensor."""
+        return f"latency_{self.endpoint}_{self._entry_id}"
+
+    @property
+    def name(self) -> str:
+        """Return the name of the entity."""
+        return self._name
+
+    @property
+    def available(self) -> bool:
+        # The statistics are there whether or not the last refresh succeeded
+        return True
+
+    @property
+    def native_value(self) -> Optional[float]:
+        return self.client.requestStats.endpoint(self.endpoint).as_dict()["p95"]
+
+    @property
+    def extra_state_attributes(self):
+        return self.client.requestStats.endpoint(self.endpoint).as_dict()
+
+    @property
+    def device_class(self):
+        return SensorDeviceClass.DURATION
+
+    @property
+    def state_class(self):
+        return SensorStateClass.MEASUREMENT
+
+    @property
+    def native_unit_of_measurement(self):
+        return UnitOfTime.MILLISECONDS
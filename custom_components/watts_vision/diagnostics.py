@@ -0,0 +1,60 @@
+"""Diagnostics support for Watts Vision."""
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .connection_pool import WattsConnectionPool
+from .const import API_CLIENT, COORDINATOR, DOMAIN, GLOBAL_MAX_CONCURRENT_REQUESTS, POOL
+from .coordinator import WattsVisionCoordinator
+from .watts_api import WattsApi
+
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD}
+# Keys of the raw API data that identify the user or the central unit
+TO_REDACT_RAW = {"email", "mac_address"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    client: WattsApi = hass.data[DOMAIN][entry.entry_id][API_CLIENT]
+    coordinator: WattsVisionCoordinator = hass.data[DOMAIN][entry.entry_id][
+        COORDINATOR
+    ]
+    pool: WattsConnectionPool = hass.data[DOMAIN][POOL]
+
+    diagnostics = {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "endpoints": client.requestStats.as_dict(),
+        "requests": {
+            "throttled": client.throttledRequests,
+            "retries": client.retriedRequests,
+            "merged_pushes": client.mergedPushes,
+            "reload_skip_rate": client.reloadSkipRate,
+            "deduplicated_reads": client.deduplicatedReads,
+            "dedup_rate": client.dedupRate,
+        },
+        "circuit_breaker": client.circuitBreaker.state,
+        "shared_pool": {
+            "entries": len(pool.entries),
+            "max_concurrent_requests": GLOBAL_MAX_CONCURRENT_REQUESTS,
+        },
+        "coordinator": {
+            "update_interval": coordinator.update_interval.total_seconds(),
+            "last_update_success": coordinator.last_update_success,
+            "stale": coordinator.stale,
+            "setup_duration": coordinator.setup_duration,
+            "suppressed_writes": coordinator.suppressed_writes,
+        },
+        "memory": client.memoryReport(),
+    }
+    if (raw := client.getRawData()) is not None:
+        diagnostics["raw"] = async_redact_data(raw, TO_REDACT_RAW)
+
+    return diagnostics
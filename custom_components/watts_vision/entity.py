@@ -0,0 +1,55 @@
+"""Base entity for the Watts Vision devices."""
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import CIRCUIT_OPEN
+from .coordinator import WattsVisionCoordinator
+from .device import WattsDevice
+
+
+class WattsVisionEntity(CoordinatorEntity[WattsVisionCoordinator]):
+    """Entity that takes its state from the coordinator's last refresh."""
+
+    def __init__(self, coordinator: WattsVisionCoordinator, smartHome: str, id: str):
+        super().__init__(coordinator)
+        self.client = coordinator.client
+        self.smartHome = smartHome
+        self.id = id
+
+    @property
+    def available(self) -> bool:
+        """Return if the device was present in the last refresh and the cloud is up."""
+        return (
+            super().available
+            and self.coordinator.circuit_state != CIRCUIT_OPEN
+            and self.client.getDevice(self.smartHome, self.id) is not None
+        )
+
+    @property
+    def assumed_state(self) -> bool:
+        """Return if the state was restored from the snapshot taken before boot."""
+        return self.coordinator.stale
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._refresh_from_device()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if (self.smartHome, self.id) not in self.coordinator.changed_devices:
+            self.coordinator.suppressed_writes += 1
+            return
+
+        self._refresh_from_device()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _refresh_from_device(self) -> None:
+        smartHomeDevice = self.client.getDevice(self.smartHome, self.id)
+        if smartHomeDevice is not None:
+            self._update_state(smartHomeDevice)
+
+    @callback
+    def _update_state(self, smartHomeDevice: WattsDevice) -> None:
+        """Update the entity attributes from the device data."""
+        raise NotImplementedError
@@ -0,0 +1,51 @@
+"""Hand the session of the config and options flows over to the entry setup."""
+from datetime import datetime
+
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DOMAIN, HANDOVER, HANDOVER_TIMEOUT
+
+
+@callback
+def async_store_session(hass: HomeAssistant, data: dict, session: dict) -> None:
+    """Keep the session a flow authenticated with the credentials in data.
+
+    It is dropped after HANDOVER_TIMEOUT seconds when no entry setup took it,
+    so the password and tokens of an abandoned flow are not kept around.
+    """
+    handovers = hass.data.setdefault(DOMAIN, {}).setdefault(HANDOVER, {})
+    username = data[CONF_USERNAME]
+    _async_drop(hass, username)
+
+    @callback
+    def expire(_now: datetime) -> None:
+        handovers.pop(username, None)
+
+    handovers[username] = (
+        data[CONF_PASSWORD],
+        session,
+        async_call_later(hass, HANDOVER_TIMEOUT, expire),
+    )
+
+
+@callback
+def async_pop_session(hass: HomeAssistant, data: dict) -> dict | None:
+    """Take the session handed over for the credentials in data, if still fresh."""
+    if (handover := _async_drop(hass, data[CONF_USERNAME])) is None:
+        return None
+
+    password, session, _cancel = handover
+    if password != data[CONF_PASSWORD]:
+        return None
+    return session
+
+
+@callback
+def _async_drop(hass: HomeAssistant, username: str) -> tuple | None:
+    """Remove the handover of username, cancelling its expiry."""
+    handovers = hass.data.get(DOMAIN, {}).get(HANDOVER, {})
+    if (handover := handovers.pop(username, None)) is not None:
+        handover[2]()
+    return handover
@@ -0,0 +1,95 @@
+"""Latency and error statistics of the Watts Vision API endpoints."""
+from collections import deque
+import math
+import sys
+
+from yarl import URL
+
+from .const import LATENCY_WINDOW
+
+
+def endpoint_name(url: str) -> str:
+    """Name an endpoint by the last two parts of its path, like smarthome/read"""
+    return "/".join([part for part in URL(url).path.split("/") if part][-2:])
+
+
+class EndpointStats:
+    """Count the requests and errors of an endpoint and keep recent latencies."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._latencies = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+
+    def record(self, seconds: float, error: bool) -> None:
+        self._latencies.append(seconds)
+        self.count += 1
+        if error:
+            self.errors += 1
+
+    def percentile(self, percent: float) -> float | None:
+        """Latency in seconds below which ``percent`` of the recent requests were"""
+        if not self._latencies:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[max(math.ceil(percent / 100 * len(latencies)) - 1, 0)]
+
+    @property
+    def max(self) -> float | None:
+        return max(self._latencies, default=None)
+
+    def as_dict(self) -> dict:
+        """Counts and the p50, p95 and max latency in milliseconds"""
+
+        def ms(seconds: float | None) -> float | None:
+            return None if seconds is None else round(seconds * 1000, 1)
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "p50": ms(self.percentile(50)),
+            "p95": ms(self.percentile(95)),
+            "max": ms(self.max),
+        }
+
+
+class RequestStats:
+    """EndpointStats of every endpoint requested so far."""
+
+    def __init__(self):
+        self._endpoints: dict[str, EndpointStats] = {}
+
+    def endpoint(self, name: str) -> EndpointStats:
+        if (stats := self._endpoints.get(name)) is None:
+            stats = self._endpoints[name] = EndpointStats()
+        return stats
+
+    def as_dict(self) -> dict:
+        return {name: stats.as_dict() for name, stats in self._endpoints.items()}
+
+
+def deep_sizeof(value, seen: set[int] | None = None) -> int:
+    """Approximate the bytes held by a value and everything it references
+
+    Objects referenced more than once, like interned strings, count once.
+    """
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(
+            deep_sizeof(key, seen) + deep_sizeof(item, seen)
+            for key, item in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in value)
+    elif hasattr(value, "__slots__"):
+        size += sum(
+            deep_sizeof(getattr(value, field), seen)
+            for field in value.__slots__
+            if hasattr(value, field)
+        )
+    return size
@@ -0,0 +1,244 @@
+"""Rate limited requests to the Watts Vision cloud, retrying throttled calls."""
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+from email.utils import parsedate_to_datetime
+import logging
+import random
+from time import monotonic
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, TypeVar
+
+from aiohttp import ClientError, ClientResponse, ClientSession
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from .circuit_breaker import CircuitBreaker
+from .const import (
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_RATE,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+    RETRY_MAX_ATTEMPTS,
+)
+from .metrics import RequestStats, endpoint_name
+
+_LOGGER = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_T = TypeVar("_T")
+
+
+class TokenBucket:
+    """Allow ``rate`` requests per second on average, in bursts of ``burst``.
+
+    The bucket can be paused, for instance when the cloud asks to retry later,
+    which holds back every caller instead of only the throttled one.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = monotonic()
+        self._paused_until = 0.0
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        while True:
+            now = monotonic()
+            self._tokens = min(
+                self._burst, self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+
+            wait = self._paused_until - now
+            if wait <= 0 and self._tokens >= 1:
+                self._tokens -= 1
+                return
+
+            await asyncio.sleep(max(wait, (1 - self._tokens) / self._rate))
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all requests for the given number of seconds."""
+        self._paused_until = max(self._paused_until, monotonic() + seconds)
+
+
+def retry_after(response: ClientResponse) -> float | None:
+    """Seconds to wait according to the Retry-After header, if any."""
+    if (value := response.headers.get("Retry-After")) is None:
+        return None
+
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    try:
+        return max((parsedate_to_datetime(value) - dt_util.utcnow()).total_seconds(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+async def read_json(response: ClientResponse) -> Any:
+    """Decode the body of a response, with the orjson backend Home Assistant uses.
+
+    Decode every response once and pass the result on, decoding large
+    smarthome/read bodies again is a noticeable share of a refresh.
+    """
+    return json_loads(await response.read())
+
+
+class SingleFlight:
+    """Let identical calls made while one is running share its result.
+
+    Calls are identical when they have the same key, like the endpoint and
+    smart home of a read. The shared call runs to the end even when a caller
+    is cancelled, the other callers still wait for it.
+    """
+
+    def __init__(self):
+        self._running: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    @property
+    def rate(self) -> float:
+        """Share of the calls that joined a running one"""
+        if not self.calls:
+            return 0.0
+        return self.shared / self.calls
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[_T]]) -> _T:
+        """Run call, or wait for the result of the running call with this key."""
+        self.calls += 1
+        if (task := self._running.get(key)) is not None:
+            self.shared += 1
+        else:
+            task = self._running[key] = asyncio.ensure_future(call())
+            task.add_done_callback(lambda task: self._done(key, task))
+
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        del self._running[key]
+        if not task.cancelled():
+            # Retrieve the exception, the callers that are left get it as well
+            task.exception()
+
+
+class WattsRequester:
+    """Send the requests of an account through its circuit breaker and token bucket.
+
+    Responses with a 429 or 5xx status are retried up to RETRY_MAX_ATTEMPTS
+    times, after the Retry-After delay or an exponential backoff with full
+    jitter. The last response is handed to the caller when retrying fails.
+    Connection errors, timeouts and 5xx responses count as failures for the
+    circuit breaker.
+
+    At most ``connections`` requests of the account are in flight at once, and
+    a ``shared_limit`` caps the requests of all accounts using the same session.
+    """
+
+    def __init__(
+        self,
+        session: ClientSession,
+        rate: float = RATE_LIMIT_RATE,
+        burst: int = RATE_LIMIT_BURST,
+        breaker: CircuitBreaker | None = None,
+        connections: int | None = None,
+        shared_limit: asyncio.Semaphore | None = None,
+    ):
+        self._session = session
+        self.breaker = breaker or CircuitBreaker()
+        self._bucket = TokenBucket(rate, burst)
+        self._limits = [
+            limit
+            for limit in (
+                None if connections is None else asyncio.Semaphore(connections),
+                shared_limit,
+            )
+            if limit is not None
+        ]
+        self.stats = RequestStats()
+        self.throttled = 0
+        self.retries = 0
+
+    @asynccontextmanager
+    async def post(self, url: str, **kwargs) -> AsyncIterator[ClientResponse]:
+        """Post like ClientSession.post, within the rate limit.
+
+        Raises CircuitOpenError without sending anything while the circuit is open.
+        """
+        self.breaker.before_request()
+
+        recorded = False
+        try:
+            async with self._post(url, **kwargs) as response:
+                recorded = True
+                if response.status >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                yield response
+        except (ClientError, asyncio.TimeoutError):
+            if not recorded:
+                recorded = True
+                self.breaker.record_failure()
+            raise
+        finally:
+            if not recorded:
+                self.breaker.release()
+
+    @asynccontextmanager
+    async def _post(self, url: str, **kwargs) -> AsyncIterator[ClientResponse]:
+        stats = self.stats.endpoint(endpoint_name(url))
+        attempt = 0
+        while True:
+            await self._bucket.acquire()
+
+            timed = False
+            try:
+                async with AsyncExitStack() as limits:
+                    # The account's limit first, so waiting for a free slot
+                    # never holds one of the shared slots
+                    for limit in self._limits:
+                        await limits.enter_async_context(limit)
+                    started = monotonic()
+
+                    async with self._session.post(url=url, **kwargs) as response:
+                        timed = True
+                        stats.record(monotonic() - started, response.status >= 400)
+                        if response.status not in RETRY_STATUSES:
+                            yield response
+                            return
+
+                        delay = retry_after(response)
+                        if delay is None:
+                            delay = random.uniform(
+                                0,
+                                min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2**attempt),
+                            )
+
+                        if response.status == 429:
+                            # Hold back the other requests of the account too,
+                            # also when this one is not retried
+                            self.throttled += 1
+                            self._bucket.pause(delay)
+
+                        attempt += 1
+                        if attempt >= RETRY_MAX_ATTEMPTS or delay > RETRY_BACKOFF_MAX:
+                            yield response
+                            return
+            except (ClientError, asyncio.TimeoutError):
+                if not timed:
+                    stats.record(monotonic() - started, True)
+                raise
+
+            _LOGGER.debug(
+                "Status %s from %s, retrying in %.1f seconds",
+                response.status,
+                url,
+                delay,
+            )
+            self.retries += 1
+            await asyncio.sleep(delay)
@@ -1,5 +1,4 @@
 """Watts Vision sensor platform."""
-from datetime import timedelta
 import logging
 from typing import Callable, Optional
 
@@ -14,24 +13,28 @@ from homeassistant.core import HomeAssistant
 from numpy import nan as NaN
 
 from .central_unit import WattsVisionLastCommunicationSensor
-from .const import API_CLIENT, DOMAIN, ERROR_MAP, PRESET_MODE_MAP
-from .watts_api import WattsApi
+from .const import COORDINATOR, DOMAIN, ENDPOINTS, ERROR_MAP, PRESET_MODE_MAP
+from .coordinator import WattsVisionCoordinator
+from .device import WattsDevice
+from .diagnostic import WattsVisionCircuitBreakerSensor, WattsVisionLatencySensor
+from .entity import WattsVisionEntity
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(seconds=120)
-
 
 async def async_setup_entry(
     hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities: Callable
 ):
     """Set up the sensor platform."""
 
-    wattsClient: WattsApi = hass.data[DOMAIN][API_CLIENT]
+    coordinator: WattsVisionCoordinator = hass.data[DOMAIN][config_entry.entry_id][
+        COORDINATOR
+    ]
 
-    smartHomes = wattsClient.getSmartHomes()
+    smartHomes = coordinator.client.getSmartHomes()
 
     sensors = []
+    centralUnits = []
 
     if smartHomes is not None:
         for y in range(len(smartHomes)):
@@ -41,56 +44,61 @@ async def async_setup_entry(
                         for x in range(len(smartHomes[y]["zones"][z]["devices"])):
                             sensors.append(
                                 WattsVisionThermostatSensor(
-                                    wattsClient,
+                                    coordinator,
                                     smartHomes[y]["smarthome_id"],
-                                    smartHomes[y]["zones"][z]["devices"][x]["id"],
+                                    smartHomes[y]["zones"][z]["devices"][x].id,
                                     smartHomes[y]["zones"][z]["zone_label"],
                                 )
                             )
                             sensors.append(
                                 WattsVisionTemperatureSensor(
-                                    wattsClient,
+                                    coordinator,
                                     smartHomes[y]["smarthome_id"],
-                                    smartHomes[y]["zones"][z]["devices"][x]["id"],
+                                    smartHomes[y]["zones"][z]["devices"][x].id,
                                     smartHomes[y]["zones"][z]["zone_label"],
                                 )
                             )
                             sensors.append(
                                 WattsVisionSetTemperatureSensor(
-                                    wattsClient,
+                                    coordinator,
                                     smartHomes[y]["smarthome_id"],
-                                    smartHomes[y]["zones"][z]["devices"][x]["id"],
+                                    smartHomes[y]["zones"][z]["devices"][x].id,
                                     smartHomes[y]["zones"][z]["zone_label"],
                                 )
                             )
                             sensors.append(
                                 WattsVisionErrorSensor(
-                                    wattsClient,
+                                    coordinator,
                                     smartHomes[y]["smarthome_id"],
-                                    smartHomes[y]["zones"][z]["devices"][x]["id"],
+                                    smartHomes[y]["zones"][z]["devices"][x].id,
                                     smartHomes[y]["zones"][z]["zone_label"],
                                 )
                             )
-            sensors.append(
+            centralUnits.append(
                 WattsVisionLastCommunicationSensor(
-                    wattsClient,
+                    coordinator,
                     smartHomes[y]["smarthome_id"],
                     smartHomes[y]["label"],
                     smartHomes[y]["mac_address"]
                 )
             )
 
-    async_add_entities(sensors, update_before_add=True)
+    diagnostics = [WattsVisionCircuitBreakerSensor(coordinator.client, config_entry)]
+    for endpoint, label in ENDPOINTS.items():
+        diagnostics.append(
+            WattsVisionLatencySensor(coordinator, config_entry, endpoint, label)
+        )
+
+    async_add_entities(sensors + centralUnits + diagnostics)
 
 
-class WattsVisionThermostatSensor(SensorEntity):
+class WattsVisionThermostatSensor(WattsVisionEntity, SensorEntity):
     """Representation of a Watts Vision thermostat."""
 
-    def __init__(self, wattsClient: WattsApi, smartHome: str, id: str, zone: str):
-        super().__init__()
-        self.client = wattsClient
-        self.smartHome = smartHome
-        self.id = id
+    def __init__(
+        self, coordinator: WattsVisionCoordinator, smartHome: str, id: str, zone: str
+    ):
+        super().__init__(coordinator, smartHome, id)
         self.zone = zone
         self._name = "Heating mode " + zone
         self._state = None
@@ -131,20 +139,17 @@ class WattsVisionThermostatSensor(SensorEntity):
             "via_device": (DOMAIN, self.smartHome),
         }
 
-    async def async_update(self):
-        smartHomeDevice = self.client.getDevice(self.smartHome, self.id)
+    def _update_state(self, smartHomeDevice: WattsDevice) -> None:
+        self._state = PRESET_MODE_MAP[smartHomeDevice.gv_mode]
 
-        self._state = PRESET_MODE_MAP[smartHomeDevice["gv_mode"]]
 
-
-class WattsVisionTemperatureSensor(SensorEntity):
+class WattsVisionTemperatureSensor(WattsVisionEntity, SensorEntity):
     """Representation of a Watts Vision temperature sensor."""
 
-    def __init__(self, wattsClient: WattsApi, smartHome: str, id: str, zone: str):
-        super().__init__()
-        self.client = wattsClient
-        self.smartHome = smartHome
-        self.id = id
+    def __init__(
+        self, coordinator: WattsVisionCoordinator, smartHome: str, id: str, zone: str
+    ):
+        super().__init__(coordinator, smartHome, id)
         self.zone = zone
         self._name = "Air temperature " + zone
         self._state = None
@@ -190,27 +195,22 @@ class WattsVisionTemperatureSensor(SensorEntity):
             "suggested_area": self.zone
         }
 
-    async def async_update(self):
-        smartHomeDevice = self.client.getDevice(self.smartHome, self.id)
+    def _update_state(self, smartHomeDevice: WattsDevice) -> None:
         if self.hass.config.units.temperature_unit == UnitOfTemperature.CELSIUS:
             self._state = round(
-                ((float(smartHomeDevice["temperature_air"]) / 10.0) - 32) * (5.0 / 9.0), 1
+                (smartHomeDevice.temperature_air - 32) * (5.0 / 9.0), 1
             )
-            # self._state = round(
-            #     (int(smartHomeDevice["temperature_air"]) - 320) * 5 / 9 / 10, 1
-            # )
         else:
-            self._state = int(smartHomeDevice["temperature_air"]) / 10
+            self._state = smartHomeDevice.temperature_air
 
 
-class WattsVisionSetTemperatureSensor(SensorEntity):
+class WattsVisionSetTemperatureSensor(WattsVisionEntity, SensorEntity):
     """Representation of a Watts Vision temperature sensor."""
 
-    def __init__(self, wattsClient: WattsApi, smartHome: str, id: str, zone: str):
-        super().__init__()
-        self.client = wattsClient
-        self.smartHome = smartHome
-        self.id = id
+    def __init__(
+        self, coordinator: WattsVisionCoordinator, smartHome: str, id: str, zone: str
+    ):
+        super().__init__(coordinator, smartHome, id)
         self.zone = zone
         self._name = "Target temperature " + zone
         self._state = None
@@ -255,43 +255,23 @@ class WattsVisionSetTemperatureSensor(SensorEntity):
             "via_device": (DOMAIN, self.smartHome),
         }
 
-    async def async_update(self):
-        smartHomeDevice = self.client.getDevice(self.smartHome, self.id)
-
-        if smartHomeDevice["gv_mode"] == "0":
-            self._state = smartHomeDevice["consigne_confort"]
-        if smartHomeDevice["gv_mode"] == "1":
+    def _update_state(self, smartHomeDevice: WattsDevice) -> None:
+        setpoint = smartHomeDevice.setpoint
+        if setpoint is None:
             self._state = NaN
-        if smartHomeDevice["gv_mode"] == "2":
-            self._state = smartHomeDevice["consigne_hg"]
-        if smartHomeDevice["gv_mode"] == "3":
-            self._state = smartHomeDevice["consigne_eco"]
-        if smartHomeDevice["gv_mode"] == "4":
-            self._state = smartHomeDevice["consigne_boost"]
-        if smartHomeDevice["gv_mode"] == "11" or smartHomeDevice["gv_mode"] == "8":
-            self._state = smartHomeDevice["consigne_manuel"]
-        if self._state != NaN:
-            if self.hass.config.units.temperature_unit == UnitOfTemperature.CELSIUS:
-                # self._state = round((int(self._state) - 320) * 5 / 9 / 10, 1)
-                self._state = round(
-                    (
-                        (
-                            float(self._state) / 10.0
-                        ) - 32
-                    ) * (5.0 / 9.0) * 2, 1
-                ) / 2
-            else:
-                self._state = int(self._state) / 10
-
-
-class WattsVisionErrorSensor(SensorEntity):
+        elif self.hass.config.units.temperature_unit == UnitOfTemperature.CELSIUS:
+            self._state = round((setpoint - 32) * (5.0 / 9.0) * 2, 1) / 2
+        else:
+            self._state = setpoint
+
+
+class WattsVisionErrorSensor(WattsVisionEntity, SensorEntity):
     """Representation of a Watts Vision battery sensor."""
 
-    def __init__(self, wattsClient: WattsApi, smartHome: str, id: str, zone: str):
-        super().__init__()
-        self.client = wattsClient
-        self.smartHome = smartHome
-        self.id = id
+    def __init__(
+        self, coordinator: WattsVisionCoordinator, smartHome: str, id: str, zone: str
+    ):
+        super().__init__(coordinator, smartHome, id)
         self.zone = zone
         self._name = "Error " + zone
         self._state = None
@@ -309,7 +289,7 @@ class WattsVisionErrorSensor(SensorEntity):
 
     @property
     def state(self) -> Optional[str]:
-        if self.client.getDevice(self.smartHome, self.id)['error_code'] > 1:
+        if self.client.getDevice(self.smartHome, self.id).error_code > 1:
             _LOGGER.warning('Thermostat battery for device %s is (almost) empty.', self.id)
         return self._state
 
@@ -334,6 +314,5 @@ class WattsVisionErrorSensor(SensorEntity):
             "via_device": (DOMAIN, self.smartHome)
         }
     
-    async def async_update(self):
-        smartHomeDevice = self.client.getDevice(self.smartHome, self.id)
-        self._state = ERROR_MAP[smartHomeDevice["error_code"]]
+    def _update_state(self, smartHomeDevice: WattsDevice) -> None:
+        self._state = ERROR_MAP[smartHomeDevice.error_code]
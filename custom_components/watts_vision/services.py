@@ -0,0 +1,128 @@
+"""Services for the Watts Vision integration."""
+import asyncio
+import logging
+
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_TEMPERATURE
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+
+from .const import API_CLIENT, COORDINATOR, DOMAIN, PRESET_MODE_MAP, THERMOSTATS
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_PRESET_MODE = "preset_mode"
+ATTR_ZONES = "zones"
+
+SERVICE_SET_ZONES = "set_zones"
+
+SET_ZONES_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ZONES): vol.All(
+            cv.ensure_list,
+            [
+                vol.All(
+                    {
+                        vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+                        vol.Optional(ATTR_TEMPERATURE): vol.Coerce(float),
+                        vol.Optional(ATTR_PRESET_MODE): vol.In(
+                            list(PRESET_MODE_MAP.values())
+                        ),
+                    },
+                    cv.has_at_least_one_key(ATTR_TEMPERATURE, ATTR_PRESET_MODE),
+                )
+            ],
+        )
+    }
+)
+
+
+async def async_set_zones(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Set the preset and/or temperature of many thermostats at once."""
+    # The thermostats of every account, with the config entry they belong to
+    thermostats = {
+        entityId: (entry.entry_id, thermostat)
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.entry_id in hass.data[DOMAIN]
+        for entityId, thermostat in hass.data[DOMAIN][entry.entry_id][
+            THERMOSTATS
+        ].items()
+    }
+
+    zones = call.data[ATTR_ZONES]
+    for zone in zones:
+        if zone[ATTR_ENTITY_ID] not in thermostats:
+            raise HomeAssistantError(
+                f"{zone[ATTR_ENTITY_ID]} is not a Watts Vision thermostat"
+            )
+
+    # Apply all optimistic updates first and let the entities write their
+    # state once, then send the pushes of all accounts concurrently.
+    commands = {}
+    for zone in zones:
+        entryId, thermostat = thermostats[zone[ATTR_ENTITY_ID]]
+        gvMode = None
+        if ATTR_PRESET_MODE in zone:
+            value, gvMode = thermostat.apply_preset_mode(zone[ATTR_PRESET_MODE])
+        if ATTR_TEMPERATURE in zone:
+            value, gvMode = thermostat.apply_temperature(zone[ATTR_TEMPERATURE], gvMode)
+        commands.setdefault(entryId, []).append(
+            (thermostat.smartHome, thermostat.deviceID, value, gvMode)
+        )
+
+    accounts = [hass.data[DOMAIN][entryId] for entryId in commands]
+    for account in accounts:
+        account[COORDINATOR].async_update_listeners()
+
+    pushed = await asyncio.gather(
+        *(
+            account[API_CLIENT].pushTemperatures(accountCommands)
+            for account, accountCommands in zip(accounts, commands.values())
+        )
+    )
+    for account in accounts:
+        # Failed pushes dropped their pending writes, show the loaded values
+        account[COORDINATOR].async_update_listeners()
+        account[COORDINATOR].async_poll_pending_writes()
+
+    # Put the results of the accounts back in the order of the zones
+    pending = {
+        entryId: iter(results) for entryId, results in zip(commands, pushed)
+    }
+    results = [next(pending[thermostats[zone[ATTR_ENTITY_ID]][0]]) for zone in zones]
+
+    response = {}
+    for zone, result in zip(zones, results):
+        if isinstance(result, Exception):
+            _LOGGER.error(f"Setting {zone[ATTR_ENTITY_ID]} failed: {result}")
+            response[zone[ATTR_ENTITY_ID]] = {"success": False, "error": str(result)}
+        else:
+            response[zone[ATTR_ENTITY_ID]] = {"success": result}
+
+    return {"results": response}
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Watts Vision services."""
+
+    async def set_zones(call: ServiceCall) -> ServiceResponse:
+        return await async_set_zones(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_ZONES,
+        set_zones,
+        schema=SET_ZONES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove the Watts Vision services."""
+    hass.services.async_remove(DOMAIN, SERVICE_SET_ZONES)
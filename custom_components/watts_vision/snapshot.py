@@ -0,0 +1,57 @@
+"""Snapshot of the last good smart home tree, to create the entities at boot."""
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+
+from .const import DOMAIN
+from .device import WattsDevice
+
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 30
+
+
+def snapshot_store(hass: HomeAssistant, username: str) -> Store:
+    """Return the store holding the smart home snapshot of an account."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{slugify(username)}.snapshot")
+
+
+def dump_smarthomes(smarthomes: list | None) -> list:
+    """Turn the smart home tree into JSON serializable data."""
+    return [
+        {
+            **smarthome,
+            "zones": None
+            if smarthome.get("zones") is None
+            else [
+                zone
+                if zone.get("devices") is None
+                else {
+                    **zone,
+                    "devices": [device.as_dict() for device in zone["devices"]],
+                }
+                for zone in smarthome["zones"]
+            ],
+        }
+        for smarthome in smarthomes or []
+    ]
+
+
+def load_smarthomes(data: list) -> list:
+    """Rebuild the smart home tree from a snapshot."""
+    return [
+        {
+            **smarthome,
+            "zones": None
+            if smarthome.get("zones") is None
+            else [
+                zone
+                if zone.get("devices") is None
+                else {
+                    **zone,
+                    "devices": [WattsDevice(**device) for device in zone["devices"]],
+                }
+                for zone in smarthome["zones"]
+            ],
+        }
+        for smarthome in data
+    ]
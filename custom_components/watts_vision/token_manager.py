@@ -0,0 +1,220 @@
+"""Access token handling for the Watts Vision API."""
+import asyncio
+from datetime import datetime, timedelta
+import logging
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import AUTH_URL, DOMAIN, TOKEN_RENEW_MARGIN
+from .request_layer import WattsRequester, read_json
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10
+
+
+class AuthenticationFailed(Exception):
+    """Error to indicate no access token could be obtained."""
+
+
+def token_store(hass: HomeAssistant, username: str) -> Store:
+    """Return the store holding the refresh token of an account."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{slugify(username)}.token")
+
+
+class WattsTokenManager:
+    """Hand out access tokens, logging in or refreshing at most once at a time.
+
+    The access token is renewed in the background shortly before it expires,
+    as long as it was used since the previous renewal, and the refresh token is
+    persisted, so a restart refreshes instead of logging in.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        requests: WattsRequester,
+        username: str,
+        password: str,
+        auth_url: str = AUTH_URL,
+    ):
+        self._hass = hass
+        self._auth_url = auth_url
+        self._requests = requests
+        self._username = username
+        self._password = password
+        self._store = token_store(hass, username)
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._unsub_renew: CALLBACK_TYPE | None = None
+        self._used = False
+        self._token = None
+        self._token_expires: datetime | None = None
+        self._refresh_token = None
+        self._refresh_expires_in: datetime | None = None
+
+    @property
+    def token(self) -> str | None:
+        """Return the current access token."""
+        return self._token
+
+    async def async_get_token(self, forcelogin: bool = False) -> str:
+        """Return a valid access token, fetching a new one when needed."""
+        self._used = True
+        if not forcelogin and self._token_valid():
+            if self._unsub_renew is None:
+                # The renewal stopped while idle, resume it for this token
+                self._schedule_renew(
+                    (self._token_expires - dt_util.utcnow()).total_seconds()
+                )
+            return self._token
+
+        async with self._lock:
+            # Another caller may have fetched a token while we were waiting
+            if not forcelogin and self._token_valid():
+                return self._token
+
+            if not self._loaded:
+                await self._async_load()
+
+            return await self._async_fetch_token(forcelogin)
+
+    def export_tokens(self) -> dict:
+        """Return the tokens, to hand them to another manager of the account."""
+        return {
+            "token": self._token,
+            "token_expires": self._token_expires,
+            "refresh_token": self._refresh_token,
+            "refresh_expires_in": self._refresh_expires_in,
+        }
+
+    def restore_tokens(self, tokens: dict) -> None:
+        """Use the tokens another manager of the account obtained.
+
+        They are newer than the saved refresh token, which is not loaded anymore.
+        """
+        self._loaded = True
+        self._token = tokens["token"]
+        self._token_expires = tokens["token_expires"]
+        self._refresh_token = tokens["refresh_token"]
+        self._refresh_expires_in = tokens["refresh_expires_in"]
+        if self._token_valid():
+            self._schedule_renew(
+                (self._token_expires - dt_util.utcnow()).total_seconds()
+            )
+
+    def async_unload(self) -> None:
+        """Stop the scheduled renewal."""
+        if self._unsub_renew is not None:
+            self._unsub_renew()
+            self._unsub_renew = None
+
+    def _token_valid(self) -> bool:
+        return self._token is not None and self._token_expires > dt_util.utcnow()
+
+    async def _async_load(self) -> None:
+        """Restore the refresh token saved before the last restart."""
+        self._loaded = True
+        if (data := await self._store.async_load()) is None:
+            return
+
+        refresh_expires_in = dt_util.parse_datetime(data["refresh_expires_in"])
+        if refresh_expires_in is not None and refresh_expires_in > dt_util.utcnow():
+            _LOGGER.debug("Restored refresh token valid until %s", refresh_expires_in)
+            self._refresh_token = data["refresh_token"]
+            self._refresh_expires_in = refresh_expires_in
+
+    async def _async_fetch_token(self, forcelogin: bool) -> str:
+        now = dt_util.utcnow()
+
+        if (
+            not forcelogin
+            and self._refresh_token
+            and self._refresh_expires_in
+            and self._refresh_expires_in > now
+        ):
+            _LOGGER.debug("Refreshing access token")
+            token = await self._async_request_token(
+                {
+                    "grant_type": "refresh_token",
+                    "refresh_token": self._refresh_token,
+                    "client_id": "app-front",
+                }
+            )
+            if token is not None:
+                return token
+
+        _LOGGER.debug("Login to get an access token.")
+        token = await self._async_request_token(
+            {
+                "grant_type": "password",
+                "username": self._username,
+                "password": self._password,
+                "client_id": "app-front",
+            }
+        )
+        if token is None:
+            raise AuthenticationFailed("Unable to log in to the Watts Vision API")
+
+        return token
+
+    async def _async_request_token(self, payload: dict) -> str | None:
+        now = dt_util.utcnow()
+
+        async with self._requests.post(url=self._auth_url, data=payload) as response:
+            if response.status != 200:
+                _LOGGER.error(
+                    "Something went wrong fetching the token: {}".format(
+                        response.status
+                    )
+                )
+                return None
+
+            token_data = await read_json(response)
+
+        self._token = token_data["access_token"]
+        self._token_expires = now + timedelta(seconds=token_data["expires_in"])
+        self._refresh_token = token_data["refresh_token"]
+        self._refresh_expires_in = now + timedelta(
+            seconds=token_data["refresh_expires_in"]
+        )
+        _LOGGER.debug(
+            f"Received access token. New refresh_token needed on {self._refresh_expires_in}"
+        )
+
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+        self._schedule_renew(token_data["expires_in"])
+
+        return self._token
+
+    def _data_to_save(self) -> dict:
+        return {
+            "refresh_token": self._refresh_token,
+            "refresh_expires_in": self._refresh_expires_in.isoformat(),
+        }
+
+    def _schedule_renew(self, expires_in: int) -> None:
+        self.async_unload()
+        self._unsub_renew = async_call_later(
+            self._hass, max(expires_in - TOKEN_RENEW_MARGIN, 0), self._async_renew
+        )
+
+    async def _async_renew(self, _now: datetime) -> None:
+        """Renew the access token before it expires, off the request path."""
+        self._unsub_renew = None
+        if not self._used:
+            # Nothing needed the token lately, the next request fetches one
+            _LOGGER.debug("Access token unused, not renewing it")
+            return
+
+        self._used = False
+        async with self._lock:
+            try:
+                await self._async_fetch_token(False)
+            except Exception as exception:  # pylint: disable=broad-except
+                # The next request will retry when the token has expired
+                _LOGGER.warning(f"Renewing the access token failed: {exception}")
@@ -1,8 +1,29 @@
-from datetime import datetime, timedelta
+import asyncio
 import logging
+from time import monotonic
 
+from aiohttp import ClientError, ClientResponse
 from homeassistant.core import HomeAssistant
-import requests
+
+from .circuit_breaker import CircuitBreaker
+from .command_queue import WattsCommandQueue
+from .connection_pool import WattsConnectionPool, pooled_session
+from .const import (
+    API_URL,
+    AUTH_URL,
+    DEFAULT_COMMAND_DELAY,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_IN_FLIGHT,
+    EVENT_CIRCUIT_BREAKER,
+    LAST_CONTACT_MARGIN,
+    PRESET_SETPOINT_FIELD,
+    PUSH_CONFIRM_TIMEOUT,
+    SMARTHOME_FIELDS,
+)
+from .device import WattsDevice, parse_zones, project, tenths
+from .metrics import RequestStats, deep_sizeof
+from .request_layer import SingleFlight, WattsRequester, read_json
+from .token_manager import WattsTokenManager
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -10,194 +31,368 @@ _LOGGER = logging.getLogger(__name__)
 class WattsApi:
     """Interface to the Watts API."""
 
-    def __init__(self, hass: HomeAssistant, username: str, password: str):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        username: str,
+        password: str,
+        max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        command_delay: float = DEFAULT_COMMAND_DELAY,
+        api_url: str = API_URL,
+        auth_url: str = AUTH_URL,
+        pool: WattsConnectionPool | None = None,
+        keep_raw: bool = False,
+    ):
         """Init dummy hub."""
         self._hass = hass
+        self._apiUrl = api_url
+        if pool is None:
+            # A session of its own, like the config flow's client
+            self._session = pooled_session(hass)
+            self._requests = WattsRequester(self._session, connections=max_in_flight)
+        else:
+            # Share the connections of the other accounts, with at most
+            # max_in_flight requests at once and within the global request limit.
+            self._session = pool.session
+            self._requests = WattsRequester(
+                self._session, connections=max_in_flight, shared_limit=pool.limit
+            )
+        self._ownsSession = pool is None
         self._username = username
-        self._password = password
-        self._token = None
-        self._token_expires = None
-        self._refresh_token = None
-        self._refresh_expires_in = None
+        self._requests.breaker.add_listener(self._circuitChanged)
+        self._tokens = WattsTokenManager(
+            hass, self._requests, username, password, auth_url
+        )
         self._smartHomeData = {}
+        self._deviceIndex = {}
+        # Only the projected tree is kept, unless the raw data is asked for
+        self._keepRaw = keep_raw
+        self._rawSmartHomes = None
+        self._rawZones = {}
+        # Size of the last loaded raw data, measured whether it is kept or not
+        self._rawBytes = {}
+        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self._reads = SingleFlight()
+        self._commands = WattsCommandQueue(hass, self.pushTemperature, command_delay)
+        self._pendingWrites = {}
+        self._lastCommunication = {}
+        self._lastContact = {}
+        self._devicesFetchedAt = {}
+        self.reloadsConsidered = 0
+        self.reloadsSkipped = 0
+
+    @property
+    def circuitBreaker(self) -> CircuitBreaker:
+        """Circuit breaker guarding the requests of this account"""
+        return self._requests.breaker
+
+    @property
+    def requestStats(self) -> RequestStats:
+        """Latency and error statistics per endpoint"""
+        return self._requests.stats
+
+    @property
+    def throttledRequests(self) -> int:
+        """Number of requests answered with a 429"""
+        return self._requests.throttled
+
+    @property
+    def retriedRequests(self) -> int:
+        """Number of requests sent again after a 429 or 5xx"""
+        return self._requests.retries
+
+    def _circuitChanged(self, state: str, previous: str) -> None:
+        self._hass.bus.async_fire(
+            EVENT_CIRCUIT_BREAKER,
+            {"username": self._username, "state": state, "previous_state": previous},
+        )
+
+    async def close(self) -> None:
+        """Send queued commands, stop renewing tokens and release an owned session."""
+        await self._commands.async_flush()
+        self._tokens.async_unload()
+        if self._ownsSession:
+            self._session.detach()
 
-    def test_authentication(self) -> bool:
+    async def test_authentication(self) -> bool:
         """Test if we can authenticate with the host."""
         try:
-            token = self.getLoginToken(True)
+            token = await self.getLoginToken(True)
             return token is not None
         except Exception as exception:
             _LOGGER.exception(f"Authentication exception {exception}")
             return False
 
-    def getLoginToken(self, forcelogin=False, firstTry=True):
-        """Get the access token for the Watts Smarthome API through login or refresh"""
+    def exportSession(self, smarthomes: list | None = None) -> dict:
+        """Get the tokens, and the smart homes loaded with them, for another client"""
+        return {"tokens": self._tokens.export_tokens(), "smarthomes": smarthomes}
 
-        now = datetime.now()
-
-        if (
-            forcelogin
-            or not self._refresh_expires_in
-            or self._refresh_expires_in <= now
-        ):
-            _LOGGER.debug("Login to get an access token.")
-            payload = {
-                "grant_type": "password",
-                "username": self._username,
-                "password": self._password,
-                "client_id": "app-front",
-            }
-        elif self._token_expires <= now:
-            _LOGGER.debug("Refreshing access token")
-            payload = {
-                "grant_type": "refresh_token",
-                "refresh_token": self._refresh_token,
-                "client_id": "app-front",
-            }
-        else:
-            _LOGGER.debug("Getting token called unneeded.")
+    def restoreSession(self, session: dict) -> None:
+        """Continue with the tokens and smart homes of another client of the account"""
+        self._tokens.restore_tokens(session["tokens"])
+        if session["smarthomes"] is not None:
+            self._smartHomeData = session["smarthomes"]
 
-        request_token_result = requests.post(
-            url="https://auth.smarthome.wattselectronics.com/realms/watts/protocol/openid-connect/token",
-            data=payload,
-        )
+    async def getLoginToken(self, forcelogin=False, firstTry=True):
+        """Get the access token for the Watts Smarthome API through login or refresh"""
+        return await self._tokens.async_get_token(forcelogin)
 
-        if request_token_result.status_code == 200:
-            token = request_token_result.json()["access_token"]
-            self._token = token
-            self._token_expires = now + timedelta(
-                seconds=request_token_result.json()["expires_in"]
-            )
-            self._refresh_token = request_token_result.json()["refresh_token"]
-            self._refresh_expires_in = now + timedelta(
-                seconds=request_token_result.json()["refresh_expires_in"]
-            )
-            _LOGGER.debug(
-                f"Received access token. New refresh_token needed on {self._refresh_expires_in}"
-            )
-            return token
-        else:
-            if firstTry:
-                self.getLoginToken(forcelogin=True, firstTry=False)
-            else:
-                _LOGGER.error(
-                    "Something went wrong fetching the token: {}".format(
-                        request_token_result.status_code
-                    )
-                )
-                raise None
+    async def loadData(self, lastCommunication: bool = False):
+        """load data from api, returning False when a smart home failed to load"""
+        smarthomes = await self.loadSmartHomes()
+        if smarthomes is None:
+            return False
 
-    def loadData(self):
-        """load data from api"""
-        smarthomes = self.loadSmartHomes()
         self._smartHomeData = smarthomes
+        return await self.reloadDevices(lastCommunication=lastCommunication)
 
-        return self.reloadDevices()
-
-    def loadSmartHomes(self, firstTry: bool = True):
+    async def loadSmartHomes(self, firstTry: bool = True):
         """Load the user data"""
-        self._refresh_token_if_expired()
-
-        headers = {"Authorization": f"Bearer {self._token}"}
         payload = {"token": "true", "email": self._username, "lang": "nl_NL"}
 
-        user_data_result = requests.post(
-            url="https://smarthome.wattselectronics.com/api/v0.1/human/user/read/",
-            headers=headers,
-            data=payload,
-        )
-
-        if self.check_response(user_data_result):
-            return user_data_result.json()["data"]["smarthomes"]
+        if (body := await self._read("user/read", payload)) is not None:
+            smarthomes = body["data"]["smarthomes"]
+            self._rawBytes[None] = deep_sizeof(smarthomes)
+            if self._keepRaw:
+                self._rawSmartHomes = smarthomes
+            return [project(smarthome, SMARTHOME_FIELDS) for smarthome in smarthomes]
 
         return None
 
-    def loadDevices(self, smarthome: str, firstTry: bool = True):
+    async def loadDevices(self, smarthome: str, firstTry: bool = True):
         """Load devices for smart home"""
-        self._refresh_token_if_expired()
-
-        headers = {"Authorization": f"Bearer {self._token}"}
         payload = {"token": "true", "smarthome_id": smarthome, "lang": "nl_NL"}
 
-        devices_result = requests.post(
-            url="https://smarthome.wattselectronics.com/api/v0.1/human/smarthome/read/",
+        if (body := await self._read("smarthome/read", payload)) is not None:
+            return body["data"]["zones"]
+
+        return None
+
+    async def _read(self, endpoint: str, payload: dict) -> dict | None:
+        """Post a read, sharing the response body with identical reads in flight
+
+        Reads are identical when they are for the same endpoint and smart home.
+        """
+        return await self._reads.run(
+            (endpoint, payload.get("smarthome_id")),
+            lambda: self._postRead(endpoint, payload),
+        )
+
+    async def _postRead(self, endpoint: str, payload: dict) -> dict | None:
+        await self._refresh_token_if_expired()
+
+        headers = {"Authorization": f"Bearer {self._tokens.token}"}
+
+        async with self._requests.post(
+            url=f"{self._apiUrl}/{endpoint}/",
             headers=headers,
             data=payload,
-        )
+        ) as result:
+            return await self.check_response(result)
 
-        if self.check_response(devices_result):
-            return devices_result.json()["data"]["zones"]
+    @property
+    def deduplicatedReads(self) -> int:
+        """Number of reads that shared the response of an identical read"""
+        return self._reads.shared
 
-        return None
+    @property
+    def dedupRate(self) -> float:
+        """Share of the reads that shared the response of an identical read"""
+        return self._reads.rate
 
-    def _refresh_token_if_expired(self) -> None:
-        """Check if token is expired and request a new one."""
-        now = datetime.now()
+    async def _refresh_token_if_expired(self) -> None:
+        """Make sure the access token is valid, refreshing it if needed."""
+        await self._tokens.async_get_token()
 
-        if (
-            self._token_expires
-            and self._token_expires <= now
-            or self._refresh_expires_in
-            and self._refresh_expires_in <= now
-        ):
-            self.getLoginToken()
+    async def reloadDevices(
+        self, smarthomeIds: list[str] | None = None, lastCommunication: bool = False
+    ):
+        """load devices for each smart home, or only for the given smart homes
 
-    def reloadDevices(self):
-        """load devices for each smart home"""
+        Returns False when the devices of a smart home failed to load. With
+        lastCommunication the last communication of the same smart homes is
+        fetched first, and the devices of smart homes whose central unit did not
+        communicate since their previous load are kept instead of reloaded.
+        """
         if self._smartHomeData is not None:
-            for y in range(len(self._smartHomeData)):
-                zones = self.loadDevices(self._smartHomeData[y]["smarthome_id"])
-                self._smartHomeData[y]["zones"] = zones
+            # Refresh once up front so the concurrent loads share the same token
+            await self._refresh_token_if_expired()
+
+            smarthomes = self._smartHomeData
+            targets = [
+                smarthome["smarthome_id"]
+                for smarthome in smarthomes
+                if smarthomeIds is None or smarthome["smarthome_id"] in smarthomeIds
+            ]
+            if lastCommunication:
+                await asyncio.gather(
+                    *(self._loadLastCommunicationLimited(s) for s in targets)
+                )
+                unconfirmed = self.unconfirmedSmartHomes()
+                idle = {
+                    smarthome["smarthome_id"]
+                    for smarthome in smarthomes
+                    if smarthome.get("zones") is not None
+                    and smarthome["smarthome_id"] not in unconfirmed
+                    and self._hubIdleSinceLoad(smarthome["smarthome_id"])
+                }
+                skipped = len(idle.intersection(targets))
+                self.reloadsConsidered += len(targets)
+                self.reloadsSkipped += skipped
+                targets = [smarthome for smarthome in targets if smarthome not in idle]
+                _LOGGER.debug(
+                    f"Skipped {skipped} idle smart homes, "
+                    f"skip rate {self.reloadSkipRate:.0%}"
+                )
+
+            results = await asyncio.gather(
+                *(self._loadDevicesLimited(smarthome) for smarthome in targets)
+            )
+            if None in results:
+                # Keep the previous tree rather than wiping the failed homes
+                return False
+
+            # Parse the devices once here, the platforms read the typed records
+            zones = {
+                smarthome: parse_zones(result)
+                for smarthome, result in zip(targets, results)
+            }
+
+            # Only swap in the new tree once every smart home has been fetched
+            self._smartHomeData = [
+                {**smarthome, "zones": zones[smarthome["smarthome_id"]]}
+                if smarthome["smarthome_id"] in zones
+                else smarthome
+                for smarthome in smarthomes
+            ]
+
+        self._rebuildDeviceIndex()
+        self._reconcilePendingWrites()
+
+        return self._smartHomeData is not None
+
+    async def _loadDevicesLimited(self, smarthome: str):
+        """Load devices for smart home, honouring the concurrency cap"""
+        async with self._semaphore:
+            started = monotonic()
+            zones = await self.loadDevices(smarthome)
+
+        if zones is not None:
+            self._devicesFetchedAt[smarthome] = started
+            self._rawBytes[smarthome] = deep_sizeof(zones)
+            if self._keepRaw:
+                self._rawZones[smarthome] = zones
+        return zones
+
+    def restoreSmartHomes(self, smarthomes: list) -> None:
+        """Use a previously loaded smart home tree until the next reload"""
+        self._smartHomeData = smarthomes
+        self._rebuildDeviceIndex()
+
+    async def _loadLastCommunicationLimited(self, smarthome: str) -> None:
+        """Cache the last communication of a smart home, keeping the old one on errors"""
+        async with self._semaphore:
+            try:
+                data = await self.getLastCommunication(smarthome)
+            except (ClientError, asyncio.TimeoutError) as exception:
+                _LOGGER.warning(
+                    f"Could not get the last communication of {smarthome}: {exception}"
+                )
+                data = None
+
+        if data is None:
+            # Without a fresh probe the devices have to be reloaded
+            self._lastContact.pop(smarthome, None)
+            return
+
+        self._lastCommunication[smarthome] = data
+        diff = data["diffObj"]
+        self._lastContact[smarthome] = monotonic() - (
+            ((diff["days"] * 24 + diff["hours"]) * 60 + diff["minutes"]) * 60
+            + diff["seconds"]
+        )
+
+    def _hubIdleSinceLoad(self, smarthome: str) -> bool:
+        """Whether the central unit did not communicate since the devices were loaded"""
+        fetched = self._devicesFetchedAt.get(smarthome)
+        contact = self._lastContact.get(smarthome)
+        return (
+            fetched is not None
+            and contact is not None
+            and contact < fetched - LAST_CONTACT_MARGIN
+        )
+
+    @property
+    def reloadSkipRate(self) -> float:
+        """Share of smart home reloads skipped because the central unit was idle"""
+        if not self.reloadsConsidered:
+            return 0.0
+        return self.reloadsSkipped / self.reloadsConsidered
 
-        return True
+    def getCachedLastCommunication(self, smarthome: str):
+        """Get the last communication fetched with the devices, if any"""
+        return self._lastCommunication.get(smarthome)
 
     def getSmartHomes(self):
         """Get smarthomes"""
         return self._smartHomeData
 
-    def getDevice(self, smarthome: str, deviceId: str):
-        """Get specific device"""
-        for y in range(len(self._smartHomeData)):
-            if self._smartHomeData[y]["smarthome_id"] == smarthome:
-                for z in range(len(self._smartHomeData[y]["zones"])):
-                    for x in range(len(self._smartHomeData[y]["zones"][z]["devices"])):
-                        if (
-                            self._smartHomeData[y]["zones"][z]["devices"][x]["id"]
-                            == deviceId
-                        ):
-                            return self._smartHomeData[y]["zones"][z]["devices"][x]
-
-        return None
-
-    def setDevice(self, smarthome: str, deviceId: str, newState: str):
-        """Set specific device"""
-        for y in range(len(self._smartHomeData)):
-            if self._smartHomeData[y]["smarthome_id"] == smarthome:
-                for z in range(len(self._smartHomeData[y]["zones"])):
-                    for x in range(len(self._smartHomeData[y]["zones"][z]["devices"])):
-                        if (
-                            self._smartHomeData[y]["zones"][z]["devices"][x]["id"]
-                            == deviceId
-                        ):
-                            # If device is found, overwrite it with the new state
-                            self._smartHomeData[y]["zones"][z]["devices"][x] = newState
-                            return self._smartHomeData[y]["zones"][z]["devices"][x]
+    def getRawData(self) -> dict | None:
+        """Get the unprojected user/read and smarthome/read data, when kept"""
+        if not self._keepRaw:
+            return None
+        return {"smarthomes": self._rawSmartHomes, "zones": self._rawZones}
+
+    def memoryReport(self) -> dict:
+        """Approximate bytes retained by the smart home tree, and by the raw data
+
+        raw_bytes is the size of the last loaded raw data, which is only
+        retained with keep_raw, and None before anything was loaded.
+        """
+        return {
+            "retained_bytes": deep_sizeof(self._smartHomeData),
+            "raw_bytes": sum(self._rawBytes.values()) if self._rawBytes else None,
+            "raw_retained": self._keepRaw,
+        }
 
-        return None
+    def getDevice(self, smarthome: str, deviceId: str) -> WattsDevice | None:
+        """Get specific device"""
+        location = self._deviceIndex.get((smarthome, deviceId))
+        if location is None:
+            return None
 
-        # def setDevice(self, smarthome: str, deviceId: str, newState: str):
-        #     """Set specific device"""
-        #     for y in range(len(self._smartHomeData)):
-        #         if self._smartHomeData[y]["smarthome_id"] == smarthome:
-        #             for x in range(len(self._smartHomeData[y]["devices"])):
-        #                 if self._smartHomeData[y]["devices"][x]["id"] == deviceId:
-        #                     # If device is found, overwrite it with the new state
-        #                     self._smartHomeData[y]["devices"][x] = newState
-        #                     return self._smartHomeData[y]["devices"][x]
+        devices, x = location
+        return self._withPendingWrite(smarthome, devices[x])
 
-        return None
+    def iterDevices(self):
+        """Iterate over (smarthome_id, id, device) of all devices"""
+        for (smarthome, deviceId), (devices, x) in self._deviceIndex.items():
+            yield smarthome, deviceId, self._withPendingWrite(smarthome, devices[x])
 
-    def pushTemperature(
+    def setDevice(self, smarthome: str, deviceId: str, newState: WattsDevice):
+        """Set specific device"""
+        location = self._deviceIndex.get((smarthome, deviceId))
+        if location is None:
+            return None
+
+        # If device is found, overwrite it with the new state
+        devices, x = location
+        devices[x] = newState
+        return devices[x]
+
+    def _rebuildDeviceIndex(self) -> None:
+        """Index every device by (smarthome_id, id) for constant time lookups"""
+        index = {}
+        for smarthome in self._smartHomeData or []:
+            for zone in smarthome.get("zones") or []:
+                devices = zone.get("devices") or []
+                for x in range(len(devices)):
+                    index[(smarthome["smarthome_id"], devices[x].id)] = (devices, x)
+
+        self._deviceIndex = index
+
+    async def pushTemperature(
         self,
         smarthome: str,
         deviceID: str,
@@ -205,9 +400,9 @@ class WattsApi:
         gvMode: str,
         firstTry: bool = True,
     ):
-        self._refresh_token_if_expired()
+        await self._refresh_token_if_expired()
 
-        headers = {"Authorization": f"Bearer {self._token}"}
+        headers = {"Authorization": f"Bearer {self._tokens.token}"}
         payload = {
             "token": "true",
             "context": "1",
@@ -219,91 +414,192 @@ class WattsApi:
             "peremption": "15000",
             "lang": "nl_NL",
         }
-        extrapayload = {}
+        extrapayload = self._pushExtraPayload(value, gvMode)
+        payload.update(extrapayload)
+
+        pushed = False
+        try:
+            async with self._requests.post(
+                url=f"{self._apiUrl}/query/push/",
+                headers=headers,
+                data=payload,
+            ) as push_result:
+                pushed = await self.check_response(push_result) is not None
+        finally:
+            self._settlePendingWrite(
+                smarthome, deviceID, self._pushedValues(gvMode, extrapayload), pushed
+            )
+        return pushed
+
+    @staticmethod
+    def _pushExtraPayload(value: str, gvMode: str) -> dict:
+        """Payload fields a push in the given gv_mode adds or overrides"""
         if gvMode == "0":
-            extrapayload = {
+            return {
                 "query[consigne_confort]": value,
                 "query[consigne_manuel]": value,
             }
-        elif gvMode == "1":
-            extrapayload = {
+        if gvMode == "1":
+            return {
                 "query[consigne_manuel]": "0",
             }
-        elif gvMode == "2":
-            extrapayload = {
+        if gvMode == "2":
+            return {
                 "query[consigne_hg]": "446",
                 "query[consigne_manuel]": "446",
                 "peremption": "20000",
             }
-        elif gvMode == "3":
-            extrapayload = {
+        if gvMode == "3":
+            return {
                 "query[consigne_eco]": value,
                 "query[consigne_manuel]": value,
             }
-        elif gvMode == "4":
-            extrapayload = {
+        if gvMode == "4":
+            return {
                 "query[time_boost]": "7200",
                 "query[consigne_boost]": value,
                 "query[consigne_manuel]": value,
             }
-        elif gvMode == "11":
-            extrapayload = {
+        if gvMode == "11":
+            return {
                 "query[consigne_manuel]": value,
             }
-        payload.update(extrapayload)
+        return {}
 
-        push_result = requests.post(
-            url="https://smarthome.wattselectronics.com/api/v0.1/human/query/push/",
-            headers=headers,
-            data=payload,
+    @staticmethod
+    def _pushedValues(gvMode: str, extrapayload: dict) -> dict:
+        """Device fields as the cloud should report them after a push"""
+        values = {"gv_mode": gvMode}
+        for key, value in extrapayload.items():
+            if key.startswith("query[consigne_"):
+                values[key[len("query[") : -1]] = tenths(value)
+        return values
+
+    def addPendingWrite(
+        self, smarthome: str, deviceID: str, value: str, gvMode: str
+    ) -> None:
+        """Show the values of a push on the device until the cloud reports them
+
+        The values are layered over the loaded device by getDevice and
+        iterDevices, surviving reloads that still bring the old values, until
+        the cloud confirms them or PUSH_CONFIRM_TIMEOUT passes. They are
+        dropped when the push fails.
+        """
+        self._pendingWrites[(smarthome, deviceID)] = (
+            self._pushedValues(gvMode, self._pushExtraPayload(value, gvMode)),
+            monotonic() + PUSH_CONFIRM_TIMEOUT,
         )
 
-        if self.check_response(push_result):
-            return True
-        return False
+    def _settlePendingWrite(
+        self, smarthome: str, deviceID: str, values: dict, pushed: bool
+    ) -> None:
+        """Wait for the cloud to confirm a sent push, forget a failed one"""
+        key = (smarthome, deviceID)
+        if (pending := self._pendingWrites.get(key)) is None or pending[0] != values:
+            # A newer write for the device stays, it has a push of its own
+            return
+
+        if pushed:
+            # Confirmation is awaited from the moment the push was accepted
+            self._pendingWrites[key] = (values, monotonic() + PUSH_CONFIRM_TIMEOUT)
+        else:
+            del self._pendingWrites[key]
+
+    def _reconcilePendingWrites(self) -> None:
+        """Forget the writes the cloud now reports, or that waited too long"""
+        if not self._pendingWrites:
+            return
+
+        for (smarthome, deviceId), (devices, x) in self._deviceIndex.items():
+            key = (smarthome, devices[x].id_device)
+            if (pending := self._pendingWrites.get(key)) is None:
+                continue
+
+            values = pending[0]
+            # Program mode pushes send no setpoint, the mode confirms them
+            field = PRESET_SETPOINT_FIELD.get(values["gv_mode"])
+            if devices[x].gv_mode == values["gv_mode"] and (
+                field not in values or getattr(devices[x], field) == values[field]
+            ):
+                del self._pendingWrites[key]
+
+        now = monotonic()
+        for key, (values, deadline) in list(self._pendingWrites.items()):
+            if deadline <= now:
+                del self._pendingWrites[key]
+
+    def _withPendingWrite(self, smarthome: str, device: WattsDevice) -> WattsDevice:
+        """The device with the values of its pending write, if any"""
+        if (pending := self._pendingWrites.get((smarthome, device.id_device))) is None:
+            return device
+        return WattsDevice(**{**device.as_dict(), **pending[0]})
+
+    def unconfirmedSmartHomes(self) -> set[str]:
+        """Smart homes with pushes the cloud has not reported back yet"""
+        return {smarthome for smarthome, deviceID in self._pendingWrites}
+
+    async def pushTemperatures(self, commands: list[tuple[str, str, str, str]]):
+        """Push (smarthome, deviceID, value, gvMode) commands concurrently.
+
+        Returns the result or raised exception of each push, in order.
+        """
+        await self._refresh_token_if_expired()
+
+        async def push(command: tuple[str, str, str, str]):
+            async with self._semaphore:
+                return await self.pushTemperature(*command)
+
+        return await asyncio.gather(
+            *(push(command) for command in commands), return_exceptions=True
+        )
 
-    def getLastCommunication(self, smarthome: str, firstTry: bool = True):
-        self._refresh_token_if_expired()
+    async def queuePushTemperature(
+        self, smarthome: str, deviceID: str, value: str, gvMode: str
+    ) -> bool:
+        """Push the temperature once no newer value arrived within the command delay"""
+        return await self._commands.async_push(smarthome, deviceID, value, gvMode)
 
-        headers = {"Authorization": f"Bearer {self._token}"}
-        payload = {"token": "true", "smarthome_id": smarthome, "lang": "nl_NL"}
+    @property
+    def mergedPushes(self) -> int:
+        """Number of pushes replaced by a newer one before being sent"""
+        return self._commands.merged
 
-        last_connection_result = requests.post(
-            url="https://smarthome.wattselectronics.com/api/v0.1/human/sandbox/check_last_connexion/",
-            headers=headers,
-            data=payload,
-        )
+    async def getLastCommunication(self, smarthome: str, firstTry: bool = True):
+        payload = {"token": "true", "smarthome_id": smarthome, "lang": "nl_NL"}
 
-        if self.check_response(last_connection_result):
-            return last_connection_result.json()["data"]
+        body = await self._read("sandbox/check_last_connexion", payload)
+        if body is not None:
+            return body["data"]
 
         return None
 
     @staticmethod
-    def check_response(response: requests.Response) -> bool:
-        if response.status_code == 200:
-            if "OK" in response.json()["code"]["key"]:
-                return True
+    async def check_response(response: ClientResponse) -> dict | None:
+        """Decode the response, returns the body when the API reports success"""
+        if response.status == 200:
+            body = await read_json(response)
+            if "OK" in body["code"]["key"]:
+                return body
             else:
                 # raise APIException("Code: {0}, key: {1}, value: {2}".format(
-                #     response.json()["code"]["code"],
-                #     response.json()["code"]["key"],
-                #     response.json()["code"]["value"]
+                #     body["code"]["code"],
+                #     body["code"]["key"],
+                #     body["code"]["value"]
                 # ))
                 _LOGGER.error(
                     "Something went wrong fetching user data. Code: {}, Key: {}, Value: {}, Data: {}".format(
-                        response.json()["code"]["code"],
-                        response.json()["code"]["key"],
-                        response.json()["code"]["value"],
-                        response.json()["data"],
+                        body["code"]["code"],
+                        body["code"]["key"],
+                        body["code"]["value"],
+                        body["data"],
                     )
                 )
-                return False
-        if response.status_code == 401:
+                return None
+        if response.status == 401:
             # raise UnauthorizedException("Unauthorized")
             _LOGGER.error("Unauthorized")
-            return False
+            return None
         else:
             # raise UnHandledStatuException(response.status_code)
-            _LOGGER.error(f"Unhandled status code {response.status_code}")
-            return False
+            _LOGGER.error(f"Unhandled status code {response.status}")
+            return None
@@ -0,0 +1,50 @@
+"""Fixtures for the Watts Vision tests."""
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.util.unit_system import US_CUSTOMARY_SYSTEM
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.watts_vision.const import DOMAIN
+
+from .fake_cloud import FakeWattsCloud
+
+
+@pytest.fixture
+async def cloud(socket_enabled):
+    """Start a fake cloud with a smart home of two thermostats."""
+    fake = FakeWattsCloud(1, 1, 2)
+    await fake.start()
+    yield fake
+    await fake.close()
+
+
+@pytest.fixture
+async def setup_account(
+    hass: HomeAssistant, enable_custom_integrations, cloud: FakeWattsCloud
+):
+    """Set up accounts on the fake cloud, unloading them after the test.
+
+    Temperatures are shown in Fahrenheit, as the thermostats report them.
+    """
+    hass.config.units = US_CUSTOMARY_SYSTEM
+    entries = []
+
+    async def setup(username: str = "user@example.com") -> MockConfigEntry:
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=username,
+            unique_id=username,
+            data=cloud.account(username),
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        entries.append(entry)
+        return entry
+
+    yield setup
+    for entry in entries:
+        if entry.state is ConfigEntryState.LOADED:
+            assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
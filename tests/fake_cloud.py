@@ -0,0 +1,209 @@
+"""Local stand-in for the Watts Vision auth and smarthome endpoints."""
+import asyncio
+from contextlib import asynccontextmanager
+import json
+from types import SimpleNamespace
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+
+from custom_components.watts_vision.const import CONF_API_URL, CONF_AUTH_URL
+from custom_components.watts_vision.device import WattsDevice
+
+OK = {"code": "1", "key": "OK", "value": "OK"}
+ERROR = {"code": "2", "key": "ERROR", "value": "Error"}
+
+
+def build_device(y: int, z: int, x: int) -> dict:
+    """Build a device as returned by smarthome/read."""
+    return {
+        "id": f"C{y}_{z}_{x}",
+        "id_device": f"C{y:02d}{z:02d}{x:02d}",
+        "temperature_air": "700",
+        "gv_mode": "0",
+        "heating_up": "0",
+        "heat_cool": "0",
+        "min_set_point": "410",
+        "max_set_point": "860",
+        "consigne_confort": "680",
+        "consigne_hg": "446",
+        "consigne_eco": "620",
+        "consigne_boost": "750",
+        "consigne_manuel": "680",
+        "error_code": 0,
+        # Fields the integration does not read
+        "nom_appareil": f"Thermostat {y}.{z}.{x}",
+        "bundle_id": f"{y:02d}{z:02d}{x:02d}",
+        "nv_mode": "0",
+        "time_boost": "0",
+        "temperature_sol": "0",
+        "battery": "0",
+        "fan_speed": "0",
+        "chauffage": "1",
+    }
+
+
+def build_smarthomes(homes: int, zones: int, devices: int) -> list:
+    """Build a parsed smart home tree, as the client keeps it."""
+    return [
+        {
+            "smarthome_id": f"home{y}",
+            "label": f"Home {y}",
+            "mac_address": f"00:00:00:00:00:{y:02x}",
+            "zones": [
+                {
+                    "zone_label": f"Zone {y}.{z}",
+                    "devices": [
+                        WattsDevice(f"C{y}_{z}_{x}", f"C{x:03d}")
+                        for x in range(devices)
+                    ],
+                }
+                for z in range(zones)
+            ],
+        }
+        for y in range(homes)
+    ]
+
+
+def fake_post(response=None, status: int = 200, on_post=None):
+    """Build a stand-in for WattsRequester.post answering with ``response`` data.
+
+    ``on_post`` is awaited with the url and form data of every post first.
+    """
+    body = json.dumps({"code": OK, "data": response}).encode()
+
+    @asynccontextmanager
+    async def post(url: str, data: dict = None, **kwargs):
+        if on_post is not None:
+            await on_post(url, data)
+
+        async def read() -> bytes:
+            return body
+
+        yield SimpleNamespace(status=status, read=read)
+
+    return post
+
+
+class FakeWattsCloud:
+    """Serve a generated account of ``homes`` x ``zones`` x ``devices``.
+
+    Every response waits ``latency`` seconds first, and pushes change the
+    devices like the cloud would once the central unit picked them up.
+    """
+
+    def __init__(self, homes: int, zones: int, devices: int, latency: float = 0):
+        self.latency = latency
+        # id_device of the devices whose pushes the cloud rejects
+        self.rejected: set[str] = set()
+        self.requests: dict[str, int] = {}
+        self.smarthomes = {
+            f"home{y}": [
+                {
+                    "zone_label": f"Zone {y}.{z}",
+                    "num_zone": str(z + 1),
+                    "zone_img_id": "0",
+                    "label_zone_type": "Living room",
+                    "devices": [build_device(y, z, x) for x in range(devices)],
+                }
+                for z in range(zones)
+            ]
+            for y in range(homes)
+        }
+
+        app = web.Application()
+        app.router.add_post("/auth/token", self._token)
+        app.router.add_post("/api/user/read/", self._user_read)
+        app.router.add_post("/api/smarthome/read/", self._smarthome_read)
+        app.router.add_post("/api/query/push/", self._push)
+        app.router.add_post(
+            "/api/sandbox/check_last_connexion/", self._last_connexion
+        )
+        self.server = TestServer(app)
+
+    @property
+    def auth_url(self) -> str:
+        return str(self.server.make_url("/auth/token"))
+
+    @property
+    def api_url(self) -> str:
+        return str(self.server.make_url("/api"))
+
+    def account(self, username: str = "user@example.com") -> dict:
+        """Config entry data of an account on this cloud."""
+        return {
+            CONF_USERNAME: username,
+            CONF_PASSWORD: "pass",
+            CONF_AUTH_URL: self.auth_url,
+            CONF_API_URL: self.api_url,
+        }
+
+    async def start(self) -> None:
+        await self.server.start_server()
+
+    async def close(self) -> None:
+        await self.server.close()
+
+    async def _respond(self, request: web.Request, data) -> web.Response:
+        self.requests[request.path] = self.requests.get(request.path, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return web.json_response({"code": OK, "data": data})
+
+    async def _token(self, request: web.Request) -> web.Response:
+        self.requests[request.path] = self.requests.get(request.path, 0) + 1
+        return web.json_response(
+            {
+                "access_token": "access",
+                "expires_in": 300,
+                "refresh_token": "refresh",
+                "refresh_expires_in": 1800,
+            }
+        )
+
+    async def _user_read(self, request: web.Request) -> web.Response:
+        return await self._respond(
+            request,
+            {
+                "smarthomes": [
+                    {
+                        "smarthome_id": smarthome,
+                        "label": smarthome,
+                        "mac_address": f"00:00:00:00:00:{y:02x}",
+                        "general_mode": "0",
+                        "holiday_mode": "0",
+                        "timezone": "Europe/Amsterdam",
+                        "ssid": "bench",
+                    }
+                    for y, smarthome in enumerate(self.smarthomes)
+                ]
+            },
+        )
+
+    async def _smarthome_read(self, request: web.Request) -> web.Response:
+        data = await request.post()
+        return await self._respond(
+            request, {"zones": self.smarthomes[data["smarthome_id"]]}
+        )
+
+    async def _push(self, request: web.Request) -> web.Response:
+        data = await request.post()
+        if data["query[id_device]"] in self.rejected:
+            self.requests[request.path] = self.requests.get(request.path, 0) + 1
+            return web.json_response({"code": ERROR, "data": "Rejected"})
+
+        for zone in self.smarthomes[data["smarthome_id"]]:
+            for device in zone["devices"]:
+                if device["id_device"] == data["query[id_device]"]:
+                    device["gv_mode"] = data["query[gv_mode]"]
+                    for key, value in data.items():
+                        if key.startswith("query[consigne_"):
+                            device[key[6:-1]] = value
+        return await self._respond(request, {})
+
+    async def _last_connexion(self, request: web.Request) -> web.Response:
+        return await self._respond(
+            request,
+            {"diffObj": {"days": 0, "hours": 0, "minutes": 0, "seconds": 1}},
+        )
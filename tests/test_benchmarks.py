@@ -0,0 +1,147 @@
+"""Benchmarks against a local stand-in of the Watts Vision cloud.
+
+They only run when the account size is set with WATTS_BENCH_SIZE as homes x
+zones x devices, for instance ``WATTS_BENCH_SIZE=10x10x5``. Every run appends
+its results, with the current commit, as a JSON line to bench_output.txt in the
+repository root. The client side rate limit is lifted so the code itself is
+measured.
+"""
+import json
+import os
+from pathlib import Path
+import subprocess
+from time import perf_counter
+import timeit
+
+from homeassistant.core import HomeAssistant
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.watts_vision.const import API_CLIENT, COORDINATOR, DOMAIN
+from custom_components.watts_vision.request_layer import TokenBucket
+from custom_components.watts_vision.watts_api import WattsApi
+
+from .fake_cloud import FakeWattsCloud, build_smarthomes
+
+ROOT = Path(__file__).parent.parent
+PUSHES = 10
+LOOKUPS = 2000
+
+pytestmark = pytest.mark.skipif(
+    "WATTS_BENCH_SIZE" not in os.environ, reason="WATTS_BENCH_SIZE is not set"
+)
+
+
+def bench_size() -> tuple[int, int, int]:
+    homes, zones, devices = os.environ["WATTS_BENCH_SIZE"].split("x")
+    return int(homes), int(zones), int(devices)
+
+
+def commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+@pytest.fixture
+async def cloud(monkeypatch, socket_enabled):
+    """Start the fake cloud and lift the client side rate limit."""
+
+    async def acquire(self):
+        pass
+
+    monkeypatch.setattr(TokenBucket, "acquire", acquire)
+
+    fake = FakeWattsCloud(*bench_size())
+    await fake.start()
+    yield fake
+    await fake.close()
+
+
+async def test_benchmark(
+    hass: HomeAssistant, enable_custom_integrations, cloud: FakeWattsCloud
+):
+    """Measure setup, a full refresh, the entity updates and push round-trips."""
+    results = {"commit": commit(), "size": "x".join(map(str, bench_size()))}
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data=cloud.account("bench@example.com"),
+    )
+    entry.add_to_hass(hass)
+
+    started = perf_counter()
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    results["setup_s"] = perf_counter() - started
+
+    client = hass.data[DOMAIN][entry.entry_id][API_CLIENT]
+    coordinator = hass.data[DOMAIN][entry.entry_id][COORDINATOR]
+    devices = sum(1 for _ in client.iterDevices())
+    assert devices == bench_size()[0] * bench_size()[1] * bench_size()[2]
+
+    started = perf_counter()
+    assert await client.reloadDevices()
+    results["full_refresh_s"] = perf_counter() - started
+
+    memory = client.memoryReport()
+    results["retained_kb"] = memory["retained_bytes"] / 1024
+    results["raw_kb"] = memory["raw_bytes"] / 1024
+
+    # Forget the fingerprints so every entity takes the new data
+    entities = len(coordinator._listeners)
+    coordinator._fingerprints = {}
+    started = perf_counter()
+    coordinator.async_update_listeners()
+    results["entity_update_us"] = (perf_counter() - started) / entities * 1e6
+
+    smarthome, deviceId, device = next(client.iterDevices())
+    started = perf_counter()
+    for value in range(PUSHES):
+        assert await client.pushTemperature(
+            smarthome, device.id_device, str(600 + value), "0"
+        )
+    results["push_ms"] = (perf_counter() - started) / PUSHES * 1000
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+    with open(ROOT / "bench_output.txt", "a", encoding="utf-8") as output:
+        output.write(json.dumps(results) + "\n")
+
+
+async def test_device_lookup_benchmark(hass: HomeAssistant):
+    """Measure getDevice from 10 to 1000 devices, its cost has to stay flat."""
+    results = {"commit": commit(), "benchmark": "device_lookup"}
+    timings = {}
+    for devices in (10, 100, 1000):
+        client = WattsApi(hass, "bench@example.com", "pass")
+        # Spread the devices over 10 smart homes with 10 zones each at most
+        client._smartHomeData = build_smarthomes(
+            min(devices, 10), min(devices // 10, 10), max(devices // 100, 1)
+        )
+        client._rebuildDeviceIndex()
+        home = client._smartHomeData[-1]["smarthome_id"]
+        last = client._smartHomeData[-1]["zones"][-1]["devices"][-1].id
+
+        timings[devices] = min(
+            timeit.repeat(
+                lambda: client.getDevice(home, last),
+                number=LOOKUPS,
+                repeat=5,
+            )
+        )
+        results[f"lookup_{devices}_ns"] = timings[devices] / LOOKUPS * 1e9
+        await client.close()
+
+    with open(ROOT / "bench_output.txt", "a", encoding="utf-8") as output:
+        output.write(json.dumps(results) + "\n")
+
+    assert timings[1000] < timings[10] * 3
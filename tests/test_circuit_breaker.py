@@ -0,0 +1,43 @@
+"""Tests for the Watts Vision circuit breaker."""
+import pytest
+
+from custom_components.watts_vision.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+)
+from custom_components.watts_vision.const import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+)
+
+
+def test_breaker_opens_probes_and_recovers():
+    """Test the breaker opens on failures and closes after a successful probe."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+    transitions = []
+    breaker.add_listener(lambda state, previous: transitions.append(state))
+
+    for _ in range(2):
+        breaker.before_request()
+        breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+
+    # The reset timeout passed, one probe is let through at a time
+    breaker.before_request()
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    breaker.record_success()
+    assert transitions == [CIRCUIT_OPEN, CIRCUIT_HALF_OPEN, CIRCUIT_CLOSED]
+
+
+def test_open_breaker_short_circuits():
+    """Test requests fail right away until the reset timeout passed."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    assert breaker.retry_in > 0
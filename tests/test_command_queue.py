@@ -0,0 +1,44 @@
+"""Tests for the Watts Vision command queue."""
+import asyncio
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.watts_vision.command_queue import WattsCommandQueue
+
+
+async def test_burst_is_coalesced_per_device(hass: HomeAssistant):
+    """Test a burst of pushes sends only the last value for each device."""
+    pushes = []
+
+    async def push(smarthome: str, deviceID: str, value: str, gvMode: str):
+        pushes.append((smarthome, deviceID, value, gvMode))
+        return True
+
+    queue = WattsCommandQueue(hass, push, 0.05)
+
+    results = await asyncio.gather(
+        *(queue.async_push("home", "C001", str(value), "0") for value in range(5)),
+        queue.async_push("home", "C002", "650", "3"),
+    )
+
+    assert results == [True] * 6
+    assert sorted(pushes) == [("home", "C001", "4", "0"), ("home", "C002", "650", "3")]
+    assert queue.merged == 4
+
+
+async def test_flush_sends_pending_commands(hass: HomeAssistant):
+    """Test flushing sends pending commands without waiting for the delay."""
+    pushes = []
+
+    async def push(smarthome: str, deviceID: str, value: str, gvMode: str):
+        pushes.append(value)
+        return True
+
+    queue = WattsCommandQueue(hass, push, 60)
+    pending = asyncio.ensure_future(queue.async_push("home", "C001", "700", "0"))
+    await asyncio.sleep(0)
+
+    await queue.async_flush()
+
+    assert await pending
+    assert pushes == ["700"]
@@ -1,8 +1,22 @@
 """Tests for the Nest config flow."""
+from unittest.mock import patch
+
 from homeassistant import data_entry_flow
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
 from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.watts_vision import config_flow
+from custom_components.watts_vision.const import (
+    CONF_COMMAND_DELAY,
+    CONF_KEEP_RAW,
+    CONF_LAST_COMMUNICATION_INTERVAL,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_IN_FLIGHT,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    DOMAIN,
+)
 
 
 async def test_data_entry_flow_form(hass: HomeAssistant):
@@ -47,3 +61,45 @@ async def test_full_flow_implementation(hass: HomeAssistant):
     #     'description_placeholders': None,
     #     'last_step': None
     # }
+
+
+async def test_options_flow_stores_options(
+    hass: HomeAssistant, enable_custom_integrations
+):
+    """Test submitting the options form stores every option."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="user@example.com",
+        unique_id="user@example.com",
+        data={CONF_USERNAME: "user@example.com", CONF_PASSWORD: "pass"},
+    )
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] == data_entry_flow.RESULT_TYPE_FORM
+    assert result["step_id"] == "init"
+
+    options = {
+        CONF_MAX_CONCURRENT_REQUESTS: 4,
+        CONF_MAX_IN_FLIGHT: 6,
+        CONF_COMMAND_DELAY: 0.5,
+        CONF_MIN_SCAN_INTERVAL: 60,
+        CONF_MAX_SCAN_INTERVAL: 600,
+        CONF_LAST_COMMUNICATION_INTERVAL: 900,
+        CONF_KEEP_RAW: True,
+    }
+    with patch(
+        "custom_components.watts_vision.config_flow.validate_input",
+        side_effect=lambda hass, data, current: data,
+    ), patch(
+        "custom_components.watts_vision.async_setup_entry", return_value=True
+    ):
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            {CONF_USERNAME: "user@example.com", CONF_PASSWORD: "new", **options},
+        )
+        await hass.async_block_till_done()
+
+    assert result["type"] == data_entry_flow.RESULT_TYPE_CREATE_ENTRY
+    assert entry.options == options
+    assert entry.data[CONF_PASSWORD] == "new"
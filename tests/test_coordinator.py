@@ -0,0 +1,155 @@
+"""Tests for the Watts Vision coordinator."""
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+import pytest
+
+from custom_components.watts_vision.coordinator import WattsVisionCoordinator
+from custom_components.watts_vision.device import WattsDevice
+
+
+class FakeClient:
+    """Client returning canned smart homes."""
+
+    def __init__(self):
+        self.smarthomes = [{"smarthome_id": "home", "zones": []}]
+        self.unconfirmed = set()
+        self.reloads = []
+        self.loads = 0
+        self.cloud = self.smarthomes
+        self.failing = False
+
+    async def reloadDevices(self, smarthomeIds=None, lastCommunication=False):
+        self.reloads.append(smarthomeIds)
+        if self.failing:
+            return False
+        self.smarthomes = [dict(smarthome) for smarthome in self.cloud]
+        return True
+
+    async def loadData(self, lastCommunication=False):
+        self.loads += 1
+        return await self.reloadDevices()
+
+    def getSmartHomes(self):
+        return self.smarthomes
+
+    def iterDevices(self):
+        for smarthome in self.smarthomes:
+            for zone in smarthome["zones"]:
+                for device in zone["devices"]:
+                    yield smarthome["smarthome_id"], device.id, device
+
+    def unconfirmedSmartHomes(self):
+        return self.unconfirmed
+
+
+async def test_backoff_while_data_is_unchanged(hass: HomeAssistant):
+    """Test the interval doubles up to the maximum and resets on changes."""
+    client = FakeClient()
+    coordinator = WattsVisionCoordinator(hass, client, 100, 300)
+
+    intervals = []
+    for _ in range(3):
+        await coordinator._async_update_data()
+        intervals.append(round(coordinator.update_interval.total_seconds()))
+    assert intervals == [200, 300, 300]
+
+    client.cloud = [{"smarthome_id": "home", "zones": [{"devices": []}]}]
+    await coordinator._async_update_data()
+    assert round(coordinator.update_interval.total_seconds()) == 100
+
+
+async def test_snapshot_is_saved_when_data_changes(hass: HomeAssistant):
+    """Test full refreshes only save the snapshot when the smart homes changed."""
+    client = FakeClient()
+    client.smarthomes = None
+    snapshots = MagicMock()
+    coordinator = WattsVisionCoordinator(hass, client, 100, 300, snapshots=snapshots)
+
+    await coordinator._async_update_data()
+    await coordinator._async_update_data()
+    assert snapshots.async_delay_save.call_count == 1
+
+    client.cloud = [{"smarthome_id": "home", "zones": [{"devices": []}]}]
+    await coordinator._async_update_data()
+    assert snapshots.async_delay_save.call_count == 2
+
+
+async def test_fast_partial_polling_after_push(hass: HomeAssistant):
+    """Test only unconfirmed smart homes are polled, at the confirm interval."""
+    client = FakeClient()
+    coordinator = WattsVisionCoordinator(hass, client, 100, 300)
+    client.unconfirmed = {"home"}
+
+    await coordinator._async_update_data()
+
+    assert client.reloads == [{"home"}]
+    assert coordinator.update_interval == timedelta(seconds=10)
+
+
+async def test_only_changed_devices_are_notified(hass: HomeAssistant):
+    """Test listeners are only told about devices whose fields changed."""
+    client = FakeClient()
+    client.cloud = [
+        {
+            "smarthome_id": "home",
+            "zones": [
+                {
+                    "devices": [
+                        WattsDevice("C001", "C001", temperature_air=68.0),
+                        WattsDevice("C002", "C002", temperature_air=70.0),
+                    ]
+                }
+            ],
+        }
+    ]
+    coordinator = WattsVisionCoordinator(hass, client, 100, 300)
+    await coordinator.async_refresh()
+    assert coordinator.changed_devices == {("home", "C001"), ("home", "C002")}
+
+    client.cloud = [
+        {
+            "smarthome_id": "home",
+            "zones": [
+                {
+                    "devices": [
+                        WattsDevice("C001", "C001", temperature_air=68.0),
+                        WattsDevice("C002", "C002", temperature_air=71.0),
+                    ]
+                }
+            ],
+        }
+    ]
+    await coordinator.async_refresh()
+    assert coordinator.changed_devices == {("home", "C002")}
+
+
+async def test_first_refresh_loads_smart_homes(hass: HomeAssistant):
+    """Test smart homes are loaded when nothing was restored from a snapshot."""
+    client = FakeClient()
+    client.smarthomes = None
+    coordinator = WattsVisionCoordinator(hass, client, 100, 300)
+
+    await coordinator.async_config_entry_first_refresh()
+
+    assert client.loads == 1
+    assert coordinator.data == client.cloud
+    assert not coordinator.stale
+
+
+async def test_api_errors_fail_the_refresh(hass: HomeAssistant):
+    """Test a refresh the API answered with an error is retried."""
+    client = FakeClient()
+    client.smarthomes = None
+    client.failing = True
+    coordinator = WattsVisionCoordinator(hass, client, 100, 300)
+
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+
+    # The smart homes are loaded again on the next refresh
+    client.failing = False
+    assert await coordinator._async_update_data() == client.cloud
+    assert client.loads == 2
@@ -0,0 +1,62 @@
+"""Tests for the Watts Vision device model."""
+from custom_components.watts_vision.device import WattsDevice, parse_zones
+
+
+def test_payload_is_parsed_and_scaled():
+    """Test the smarthome/read device fields are parsed into typed values."""
+    zones = parse_zones(
+        [
+            {
+                "zone_label": "Living",
+                "devices": [
+                    {
+                        "id": "C001",
+                        "id_device": "C001",
+                        "temperature_air": "700",
+                        "gv_mode": "3",
+                        "heating_up": "1",
+                        "heat_cool": "0",
+                        "min_set_point": "410",
+                        "max_set_point": "860",
+                        "consigne_confort": "680",
+                        "consigne_hg": "446",
+                        "consigne_eco": "620",
+                        "consigne_boost": "750",
+                        "consigne_manuel": "680",
+                        "error_code": 0,
+                    }
+                ],
+            },
+            {"zone_label": "Empty", "devices": None},
+        ]
+    )
+
+    device = zones[0]["devices"][0]
+    assert isinstance(device, WattsDevice)
+    assert device.temperature_air == 70.0
+    assert device.heating_up is True
+    assert device.heat_cool is False
+    assert device.min_set_point == 41.0
+    assert device.setpoint == 62.0
+    assert zones[1]["devices"] is None
+
+    device.gv_mode = "8"
+    assert device.setpoint == device.consigne_manuel
+
+    device.gv_mode = "1"
+    assert device.setpoint is None
+
+
+def test_unused_zone_fields_are_dropped():
+    """Test only the zone fields the platforms read are kept."""
+    zones = parse_zones(
+        [
+            {"zone_label": "Living", "num_zone": "1", "zone_img_id": "4"},
+            {"zone_label": "Kitchen", "devices": []},
+        ]
+    )
+
+    assert zones == [
+        {"zone_label": "Living", "devices": None},
+        {"zone_label": "Kitchen", "devices": []},
+    ]
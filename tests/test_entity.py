@@ -0,0 +1,35 @@
+"""Tests for the Watts Vision entities."""
+from homeassistant.components.climate import ATTR_CURRENT_TEMPERATURE
+from homeassistant.core import HomeAssistant
+
+from custom_components.watts_vision.const import COORDINATOR, DOMAIN, THERMOSTATS
+
+from .fake_cloud import FakeWattsCloud
+
+
+async def test_refresh_updates_the_changed_entities(
+    hass: HomeAssistant, cloud: FakeWattsCloud, setup_account
+):
+    """Test a refresh writes the state of the entities whose device changed."""
+    entry = await setup_account()
+
+    coordinator = hass.data[DOMAIN][entry.entry_id][COORDINATOR]
+    entities = {
+        thermostat.id: entityId
+        for entityId, thermostat in hass.data[DOMAIN][entry.entry_id][
+            THERMOSTATS
+        ].items()
+    }
+    changed, unchanged = (
+        entities[device["id"]] for device in cloud.smarthomes["home0"][0]["devices"]
+    )
+    before = hass.states.get(unchanged)
+
+    cloud.smarthomes["home0"][0]["devices"][0]["temperature_air"] = "740"
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert hass.states.get(changed).attributes[ATTR_CURRENT_TEMPERATURE] == 74
+    # The other thermostat did not write its unchanged state again
+    assert hass.states.get(unchanged).last_updated == before.last_updated
+    assert coordinator.suppressed_writes > 0
@@ -8,3 +8,95 @@
 # async def test_async_setup(hass: HomeAssistant):
 #     """Test the component gets setup."""
 #     assert await async_setup_component(hass, DOMAIN, {}) is True
+
+
+from datetime import timedelta
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.watts_vision.const import (
+    API_CLIENT,
+    DOMAIN,
+    HANDOVER,
+    HANDOVER_TIMEOUT,
+    POOL,
+)
+from custom_components.watts_vision.handover import (
+    async_pop_session,
+    async_store_session,
+)
+from custom_components.watts_vision.watts_api import WattsApi
+
+from .fake_cloud import FakeWattsCloud
+
+
+async def test_entries_have_their_own_client(hass: HomeAssistant, setup_account):
+    """Test two accounts get their own client on one shared pool."""
+    entries = [
+        await setup_account(username)
+        for username in ("first@example.com", "second@example.com")
+    ]
+
+    first, second = (hass.data[DOMAIN][entry.entry_id][API_CLIENT] for entry in entries)
+    assert first is not second
+    assert first._session is second._session
+    connector = second._session.connector
+    assert hass.data[DOMAIN][POOL].entries == {entry.entry_id for entry in entries}
+
+    # Unloading one account leaves the other one and the services working
+    assert await hass.config_entries.async_unload(entries[0].entry_id)
+    await hass.async_block_till_done()
+    assert entries[1].state is ConfigEntryState.LOADED
+    assert not second._session.closed
+    assert hass.services.has_service(DOMAIN, "set_zones")
+
+    assert await hass.config_entries.async_unload(entries[1].entry_id)
+    await hass.async_block_till_done()
+    assert second._session.closed
+    # Home Assistant's connections stay open for its other integrations
+    assert not connector.closed
+    assert POOL not in hass.data[DOMAIN]
+    assert not hass.services.has_service(DOMAIN, "set_zones")
+
+
+async def test_setup_continues_the_flow_session(
+    hass: HomeAssistant, cloud: FakeWattsCloud, setup_account
+):
+    """Test setup reuses the tokens and smart homes the flow loaded."""
+    data = cloud.account()
+
+    # What validate_input does, against the fake cloud
+    api = WattsApi(
+        hass, "user@example.com", "pass", api_url=cloud.api_url, auth_url=cloud.auth_url
+    )
+    assert await api.test_authentication()
+    async_store_session(hass, data, api.exportSession(await api.loadSmartHomes()))
+    await api.close()
+    cloud.requests.clear()
+
+    entry = await setup_account()
+
+    # No login and no user/read, only the devices are loaded
+    assert "/auth/token" not in cloud.requests
+    assert "/api/user/read/" not in cloud.requests
+    assert cloud.requests["/api/smarthome/read/"] == 1
+    client = hass.data[DOMAIN][entry.entry_id][API_CLIENT]
+    assert sum(1 for _ in client.iterDevices()) == 2
+
+
+async def test_unclaimed_flow_session_expires(hass: HomeAssistant):
+    """Test the session of a flow no entry setup took is dropped."""
+    data = {CONF_USERNAME: "user@example.com", CONF_PASSWORD: "pass"}
+    async_store_session(hass, data, {"tokens": {}})
+    assert "user@example.com" in hass.data[DOMAIN][HANDOVER]
+
+    expired = dt_util.utcnow() + timedelta(seconds=HANDOVER_TIMEOUT)
+    async_fire_time_changed(hass, expired)
+    await hass.async_block_till_done()
+
+    assert hass.data[DOMAIN][HANDOVER] == {}
+    assert async_pop_session(hass, data) is None
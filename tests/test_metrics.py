@@ -0,0 +1,27 @@
+"""Tests for the Watts Vision endpoint statistics."""
+from custom_components.watts_vision.const import API_URL, AUTH_URL
+from custom_components.watts_vision.metrics import EndpointStats, endpoint_name
+
+
+def test_endpoint_names():
+    """Test endpoints are named by the end of their path."""
+    assert endpoint_name(f"{API_URL}/smarthome/read/") == "smarthome/read"
+    assert endpoint_name(f"{API_URL}/sandbox/check_last_connexion/") == (
+        "sandbox/check_last_connexion"
+    )
+    assert endpoint_name(AUTH_URL) == "openid-connect/token"
+
+
+def test_percentiles_and_errors():
+    """Test the percentiles, maximum and counts of recorded requests."""
+    stats = EndpointStats()
+    for latency in range(1, 101):
+        stats.record(latency / 1000, error=latency > 98)
+
+    assert stats.as_dict() == {
+        "count": 100,
+        "errors": 2,
+        "p50": 50.0,
+        "p95": 95.0,
+        "max": 100.0,
+    }
@@ -0,0 +1,158 @@
+"""Tests for the Watts Vision request layer."""
+import asyncio
+from contextlib import asynccontextmanager
+from time import monotonic
+
+from aiohttp import ClientError
+
+from custom_components.watts_vision.request_layer import (
+    SingleFlight,
+    TokenBucket,
+    WattsRequester,
+)
+
+
+class FakeResponse:
+    """Response with a status and headers."""
+
+    def __init__(self, status: int, headers: dict | None = None):
+        self.status = status
+        self.headers = headers or {}
+
+
+class FakeSession:
+    """Session answering posts with the queued responses."""
+
+    def __init__(self, responses: list):
+        self.responses = responses
+        self.posts = 0
+
+    @asynccontextmanager
+    async def post(self, url: str, **kwargs):
+        self.posts += 1
+        yield self.responses.pop(0)
+
+
+async def test_throttled_request_is_retried_after_retry_after():
+    """Test a 429 is retried once the Retry-After delay passed."""
+    session = FakeSession([FakeResponse(429, {"Retry-After": "0.05"}), FakeResponse(200)])
+    requester = WattsRequester(session)
+
+    started = monotonic()
+    async with requester.post("https://example.com") as response:
+        assert response.status == 200
+
+    assert monotonic() - started >= 0.05
+    assert session.posts == 2
+    assert requester.throttled == 1
+
+
+async def test_long_retry_after_pauses_the_account():
+    """Test a 429 asking to wait too long is returned and pauses the bucket."""
+    session = FakeSession([FakeResponse(429, {"Retry-After": "3600"})])
+    requester = WattsRequester(session)
+
+    async with requester.post("https://example.com") as response:
+        assert response.status == 429
+
+    assert session.posts == 1
+    assert requester._bucket._paused_until >= monotonic() + 3500
+
+
+async def test_last_response_is_returned_when_retries_run_out(monkeypatch):
+    """Test failing requests give up after the maximum number of attempts."""
+    monkeypatch.setattr(
+        "custom_components.watts_vision.request_layer.RETRY_BACKOFF_BASE", 0.001
+    )
+    session = FakeSession([FakeResponse(503) for _ in range(4)])
+    requester = WattsRequester(session)
+
+    async with requester.post("https://example.com") as response:
+        assert response.status == 503
+
+    assert session.posts == 4
+    assert requester.retries == 3
+
+
+async def test_token_bucket_limits_the_rate():
+    """Test requests beyond the burst wait for the bucket to refill."""
+    bucket = TokenBucket(rate=100, burst=2)
+
+    started = monotonic()
+    for _ in range(6):
+        await bucket.acquire()
+
+    # Two from the burst, four refilled at 100 per second
+    assert monotonic() - started >= 0.035
+
+
+async def test_account_and_shared_limits_cap_requests_in_flight():
+    """Test an account stays within its own limit and the shared one."""
+    running = 0
+    peak = 0
+
+    class SlowSession:
+        @asynccontextmanager
+        async def post(self, url: str, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            yield FakeResponse(200)
+
+    async def send(requester: WattsRequester):
+        async with requester.post("https://example.com"):
+            pass
+
+    shared = asyncio.Semaphore(3)
+    first = WattsRequester(SlowSession(), connections=2, shared_limit=shared)
+    await asyncio.gather(*(send(first) for _ in range(6)))
+    assert peak == 2
+
+    peak = 0
+    second = WattsRequester(SlowSession(), connections=2, shared_limit=shared)
+    await asyncio.gather(
+        *(send(first) for _ in range(6)), *(send(second) for _ in range(6))
+    )
+    assert peak == 3
+
+
+async def test_identical_calls_share_one_run():
+    """Test calls with the same key made while one runs share its result."""
+    flight = SingleFlight()
+    runs = []
+
+    async def read(key: str):
+        runs.append(key)
+        await asyncio.sleep(0.01)
+        return object()
+
+    first, second, other = await asyncio.gather(
+        flight.run("home0", lambda: read("home0")),
+        flight.run("home0", lambda: read("home0")),
+        flight.run("home1", lambda: read("home1")),
+    )
+    assert first is second
+    assert first is not other
+    assert runs == ["home0", "home1"]
+    assert flight.rate == 1 / 3
+
+    # A call made after the shared one finished runs again
+    await flight.run("home0", lambda: read("home0"))
+    assert runs == ["home0", "home1", "home0"]
+
+
+async def test_shared_call_raises_for_every_caller():
+    """Test an error of the shared call reaches all callers."""
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ClientError("down")
+
+    results = await asyncio.gather(
+        flight.run("home0", fail), flight.run("home0", fail), return_exceptions=True
+    )
+    assert all(isinstance(result, ClientError) for result in results)
+    assert flight.shared == 1
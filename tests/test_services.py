@@ -0,0 +1,99 @@
+"""Tests for the Watts Vision services."""
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_TEMPERATURE
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+import pytest
+
+from custom_components.watts_vision.const import DOMAIN, PRESET_ECO, THERMOSTATS
+from custom_components.watts_vision.services import (
+    ATTR_PRESET_MODE,
+    ATTR_ZONES,
+    SERVICE_SET_ZONES,
+)
+
+from .fake_cloud import FakeWattsCloud
+
+PUSH = "/api/query/push/"
+
+
+@pytest.fixture
+async def thermostats(hass: HomeAssistant, setup_account) -> list[str]:
+    """Set up an account on the fake cloud, returns its thermostat entities."""
+    entry = await setup_account()
+    return sorted(hass.data[DOMAIN][entry.entry_id][THERMOSTATS])
+
+
+async def set_zones(hass: HomeAssistant, zones: list[dict]) -> dict:
+    return await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_ZONES,
+        {ATTR_ZONES: zones},
+        blocking=True,
+        return_response=True,
+    )
+
+
+async def test_set_zones(
+    hass: HomeAssistant, cloud: FakeWattsCloud, thermostats: list[str]
+):
+    """Test every zone of the batch is pushed to the cloud."""
+    first, second = thermostats
+
+    response = await set_zones(
+        hass,
+        [
+            {ATTR_ENTITY_ID: first, ATTR_PRESET_MODE: PRESET_ECO},
+            {ATTR_ENTITY_ID: second, ATTR_TEMPERATURE: 72},
+        ],
+    )
+
+    assert response == {
+        "results": {first: {"success": True}, second: {"success": True}}
+    }
+    assert cloud.requests[PUSH] == 2
+    devices = cloud.smarthomes["home0"][0]["devices"]
+    assert devices[0]["gv_mode"] == "3"
+    assert devices[1]["consigne_confort"] == "720"
+    assert hass.states.get(first).attributes["preset_mode"] == PRESET_ECO
+    assert hass.states.get(second).attributes[ATTR_TEMPERATURE] == 72
+
+
+async def test_set_zones_unknown_entity(
+    hass: HomeAssistant, cloud: FakeWattsCloud, thermostats: list[str]
+):
+    """Test nothing is pushed when a zone is not a Watts Vision thermostat."""
+    with pytest.raises(HomeAssistantError):
+        await set_zones(
+            hass,
+            [
+                {ATTR_ENTITY_ID: thermostats[0], ATTR_TEMPERATURE: 72},
+                {ATTR_ENTITY_ID: "climate.unknown", ATTR_TEMPERATURE: 72},
+            ],
+        )
+
+    assert PUSH not in cloud.requests
+
+
+async def test_set_zones_mixed_results(
+    hass: HomeAssistant, cloud: FakeWattsCloud, thermostats: list[str]
+):
+    """Test a rejected push fails its own zone only."""
+    first, second = thermostats
+    devices = cloud.smarthomes["home0"][0]["devices"]
+    cloud.rejected.add(devices[1]["id_device"])
+
+    response = await set_zones(
+        hass,
+        [
+            {ATTR_ENTITY_ID: first, ATTR_TEMPERATURE: 72},
+            {ATTR_ENTITY_ID: second, ATTR_TEMPERATURE: 72},
+        ],
+    )
+
+    assert response == {
+        "results": {first: {"success": True}, second: {"success": False}}
+    }
+    assert devices[0]["consigne_confort"] == "720"
+    assert devices[1]["consigne_confort"] == "680"
+    # The rejected zone shows its loaded values again
+    assert hass.states.get(second).attributes[ATTR_TEMPERATURE] == 68
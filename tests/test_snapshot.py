@@ -0,0 +1,28 @@
+"""Tests for the Watts Vision smart home snapshot."""
+from custom_components.watts_vision.device import WattsDevice
+from custom_components.watts_vision.snapshot import dump_smarthomes, load_smarthomes
+
+
+def test_snapshot_round_trip():
+    """Test a dumped tree is restored with typed devices."""
+    smarthomes = [
+        {
+            "smarthome_id": "home",
+            "label": "Home",
+            "zones": [
+                {
+                    "zone_label": "Living",
+                    "devices": [
+                        WattsDevice("C001", "C001", temperature_air=70.0, gv_mode="3")
+                    ],
+                },
+                {"zone_label": "Empty", "devices": None},
+            ],
+        },
+        {"smarthome_id": "other", "label": "Other", "zones": None},
+    ]
+
+    data = dump_smarthomes(smarthomes)
+
+    assert data[0]["zones"][0]["devices"][0]["temperature_air"] == 70.0
+    assert load_smarthomes(data) == smarthomes
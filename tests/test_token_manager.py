@@ -0,0 +1,99 @@
+"""Tests for the Watts Vision token manager."""
+import asyncio
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.watts_vision.token_manager import WattsTokenManager
+
+
+def fake_token_response(manager: WattsTokenManager, grants: list):
+    """Replace the token request by one that records the grant types."""
+
+    async def request_token(payload: dict):
+        grants.append(payload["grant_type"])
+        await asyncio.sleep(0)
+        manager._token = f"token{len(grants)}"
+        manager._token_expires = dt_util.utcnow() + timedelta(seconds=300)
+        manager._refresh_token = "refresh"
+        manager._refresh_expires_in = dt_util.utcnow() + timedelta(seconds=1800)
+        return manager._token
+
+    manager._async_request_token = request_token
+
+
+async def test_concurrent_callers_share_one_login(hass: HomeAssistant):
+    """Test concurrent token requests are coalesced into one login."""
+    manager = WattsTokenManager(hass, None, "user@example.com", "pass")
+    grants = []
+    fake_token_response(manager, grants)
+
+    tokens = await asyncio.gather(*(manager.async_get_token() for _ in range(5)))
+
+    assert grants == ["password"]
+    assert tokens == ["token1"] * 5
+
+
+async def test_restored_refresh_token_avoids_login(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+):
+    """Test a refresh token saved before a restart is used instead of a login."""
+    hass_storage["watts_vision.user_example_com.token"] = {
+        "version": 1,
+        "data": {
+            "refresh_token": "refresh",
+            "refresh_expires_in": (
+                dt_util.utcnow() + timedelta(seconds=600)
+            ).isoformat(),
+        },
+    }
+    manager = WattsTokenManager(hass, None, "user@example.com", "pass")
+    grants = []
+    fake_token_response(manager, grants)
+
+    assert await manager.async_get_token() == "token1"
+    assert grants == ["refresh_token"]
+
+
+async def test_handed_over_tokens_avoid_login(hass: HomeAssistant):
+    """Test tokens handed over by another manager are used as they are."""
+    flow = WattsTokenManager(hass, None, "user@example.com", "pass")
+    fake_token_response(flow, [])
+    await flow.async_get_token(True)
+
+    manager = WattsTokenManager(hass, None, "user@example.com", "pass")
+    grants = []
+    fake_token_response(manager, grants)
+    manager.restore_tokens(flow.export_tokens())
+
+    assert await manager.async_get_token() == "token1"
+    assert grants == []
+
+    manager.async_unload()
+
+
+async def test_unused_token_is_not_renewed(hass: HomeAssistant):
+    """Test the background renewal stops once nothing uses the token."""
+    manager = WattsTokenManager(hass, None, "user@example.com", "pass")
+    grants = []
+    fake_token_response(manager, grants)
+    await manager.async_get_token()
+
+    await manager._async_renew(dt_util.utcnow())
+    assert grants == ["password", "refresh_token"]
+
+    await manager._async_renew(dt_util.utcnow())
+    assert grants == ["password", "refresh_token"]
+    assert manager._unsub_renew is None
+
+    # Using the token again resumes the renewal
+    await manager.async_get_token()
+    assert manager._unsub_renew is not None
+    manager.async_unload()
+
+    # The next request renews the expired token itself
+    manager._token_expires = dt_util.utcnow()
+    assert await manager.async_get_token() == "token3"
+    assert grants == ["password", "refresh_token", "refresh_token"]
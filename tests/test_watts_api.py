@@ -0,0 +1,326 @@
+"""Tests for the Watts Vision API client."""
+import asyncio
+import json
+from unittest.mock import AsyncMock
+
+from homeassistant.core import HomeAssistant
+import pytest
+
+from custom_components.watts_vision.device import WattsDevice
+from custom_components.watts_vision.watts_api import WattsApi
+
+from .fake_cloud import build_device, build_smarthomes, fake_post
+
+
+@pytest.fixture
+async def make_client(hass: HomeAssistant):
+    """Build clients that use the stored token, closing them after the test."""
+    clients = []
+
+    def make(**kwargs) -> WattsApi:
+        client = WattsApi(hass, "user", "pass", **kwargs)
+        client._refresh_token_if_expired = AsyncMock()
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        await client.close()
+
+
+async def test_reload_devices_concurrency_cap(make_client):
+    """Test smart homes are fetched concurrently within the configured cap."""
+    client = make_client(max_concurrent_requests=2)
+    client._smartHomeData = build_smarthomes(5, 1, 1)
+
+    running = 0
+    peak = 0
+
+    async def load_devices(smarthome: str):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return [{"zone_label": smarthome, "devices": []}]
+
+    client.loadDevices = load_devices
+
+    assert await client.reloadDevices()
+
+    assert peak == 2
+    assert [home["zones"][0]["zone_label"] for home in client.getSmartHomes()] == [
+        f"home{y}" for y in range(5)
+    ]
+
+
+async def test_failed_smart_home_keeps_the_previous_tree(make_client):
+    """Test no smart home is updated when one of them failed to load."""
+    client = make_client()
+    client._smartHomeData = build_smarthomes(2, 1, 1)
+    previous = client.getSmartHomes()
+
+    async def load_devices(smarthome: str):
+        if smarthome == "home1":
+            return None
+        return [{"zone_label": "Reloaded", "devices": []}]
+
+    client.loadDevices = load_devices
+
+    assert not await client.reloadDevices()
+    assert client.getSmartHomes() is previous
+
+
+async def test_device_index(make_client):
+    """Test lookups and writes go through the device index."""
+    client = make_client()
+    client._smartHomeData = build_smarthomes(2, 2, 2)
+    client._rebuildDeviceIndex()
+
+    assert client.getDevice("home1", "C1_1_0").id_device == "C000"
+    assert client.getDevice("home0", "C1_1_0") is None
+
+    client.setDevice("home1", "C1_1_0", WattsDevice("C1_1_0", "new"))
+    assert client.getSmartHomes()[1]["zones"][1]["devices"][0].id_device == "new"
+    assert client.getDevice("home1", "C1_1_0").id_device == "new"
+
+
+class UnscannableList(list):
+    """List failing the test when something iterates over it."""
+
+    def __iter__(self):
+        raise AssertionError("The smart home tree was scanned")
+
+
+async def test_device_lookup_uses_the_index(make_client):
+    """Test getDevice finds a device among 1000 without scanning the tree."""
+    client = make_client()
+    client._smartHomeData = build_smarthomes(10, 10, 10)
+    client._rebuildDeviceIndex()
+    client._smartHomeData = UnscannableList(client._smartHomeData)
+
+    assert client.getDevice("home9", "C9_9_9").id_device == "C009"
+    assert client.getDevice("home9", "C9_9_10") is None
+
+
+async def test_last_communication_fetched_with_devices(make_client):
+    """Test the last communication is fetched and cached with the devices."""
+    client = make_client()
+    client._smartHomeData = build_smarthomes(2, 1, 1)
+    fetched = []
+
+    async def load_devices(smarthome: str):
+        return []
+
+    async def get_last_communication(smarthome: str):
+        fetched.append(smarthome)
+        return {"diffObj": {"days": 0, "hours": 0, "minutes": 1, "seconds": 2}}
+
+    client.loadDevices = load_devices
+    client.getLastCommunication = get_last_communication
+
+    await client.reloadDevices()
+    assert fetched == []
+    assert client.getCachedLastCommunication("home0") is None
+
+    await client.reloadDevices(lastCommunication=True)
+    assert sorted(fetched) == ["home0", "home1"]
+    assert client.getCachedLastCommunication("home1")["diffObj"]["seconds"] == 2
+
+
+async def test_idle_smart_homes_are_not_reloaded(make_client):
+    """Test smart homes whose central unit was idle since the last load are skipped."""
+    client = make_client()
+    client._smartHomeData = build_smarthomes(2, 1, 1)
+    loaded = []
+    seconds = {"home0": 30, "home1": 600}
+
+    async def load_devices(smarthome: str):
+        loaded.append(smarthome)
+        return []
+
+    async def get_last_communication(smarthome: str):
+        diff = {"days": 0, "hours": 0, "minutes": 0, "seconds": seconds[smarthome]}
+        return {"diffObj": diff}
+
+    client.loadDevices = load_devices
+    client.getLastCommunication = get_last_communication
+
+    # Nothing was loaded yet, so nothing can be skipped
+    await client.reloadDevices(lastCommunication=True)
+    assert sorted(loaded) == ["home0", "home1"]
+
+    loaded.clear()
+    await client.reloadDevices(lastCommunication=True)
+    assert loaded == []
+    assert client.getSmartHomes()[0]["zones"] == []
+    assert client.reloadSkipRate == 0.5
+
+    # home0 communicated 2 seconds ago, after its previous load
+    seconds["home0"] = 2
+    client._devicesFetchedAt["home0"] -= 10
+    await client.reloadDevices(lastCommunication=True)
+    assert loaded == ["home0"]
+    assert client.reloadsSkipped == 3
+
+
+async def test_pending_write_is_shown_until_confirmed(make_client):
+    """Test a write survives reloads with the old values until the cloud has it."""
+    client = make_client()
+    cloud = build_device(0, 0, 0)
+    client._smartHomeData = [{"smarthome_id": "home0", "zones": None}]
+
+    async def load_devices(smarthome: str):
+        return [{"zone_label": "Zone", "devices": [dict(cloud)]}]
+
+    client.loadDevices = load_devices
+    await client.reloadDevices()
+
+    client.addPendingWrite("home0", cloud["id_device"], "650", "3")
+    device = client.getDevice("home0", cloud["id"])
+    assert (device.gv_mode, device.consigne_eco, device.consigne_manuel) == (
+        "3",
+        65.0,
+        65.0,
+    )
+
+    # The cloud did not pick up the push yet
+    await client.reloadDevices()
+    assert client.getDevice("home0", cloud["id"]).gv_mode == "3"
+    assert client.unconfirmedSmartHomes() == {"home0"}
+
+    cloud.update(gv_mode="3", consigne_eco="650")
+    await client.reloadDevices()
+    assert client.unconfirmedSmartHomes() == set()
+    # The loaded device is used again, the cloud did not change consigne_manuel
+    assert client.getDevice("home0", cloud["id"]).consigne_manuel == 68.0
+
+
+async def test_pending_write_is_dropped_when_the_push_fails(make_client):
+    """Test the loaded values are shown again after a failed push."""
+    client = make_client()
+    client._smartHomeData = build_smarthomes(1, 1, 1)
+    client._rebuildDeviceIndex()
+
+    client._requests.post = fake_post(status=503)
+
+    client.addPendingWrite("home0", "C000", "650", "3")
+    assert client.getDevice("home0", "C0_0_0").gv_mode == "3"
+
+    assert not await client.pushTemperature("home0", "C000", "650", "3")
+    assert client.getDevice("home0", "C0_0_0").gv_mode == "0"
+    assert client.unconfirmedSmartHomes() == set()
+
+
+async def test_program_mode_write_is_confirmed_by_its_mode(make_client):
+    """Test a push without a setpoint is confirmed once the cloud has the mode."""
+    client = make_client()
+    cloud = build_device(0, 0, 0)
+    client._smartHomeData = [{"smarthome_id": "home0", "zones": None}]
+
+    async def load_devices(smarthome: str):
+        return [{"zone_label": "Zone", "devices": [dict(cloud)]}]
+
+    client.loadDevices = load_devices
+    await client.reloadDevices()
+
+    client.addPendingWrite("home0", cloud["id_device"], "680", "8")
+    assert await client.reloadDevices()
+    assert client.unconfirmedSmartHomes() == {"home0"}
+
+    cloud.update(gv_mode="8")
+    assert await client.reloadDevices()
+    assert client.unconfirmedSmartHomes() == set()
+
+
+async def test_newer_write_survives_an_older_push(make_client):
+    """Test a write made while an older push is in flight is kept."""
+    client = make_client()
+    client._smartHomeData = build_smarthomes(1, 1, 1)
+    client._rebuildDeviceIndex()
+
+    async def on_post(url: str, data: dict) -> None:
+        client.addPendingWrite("home0", "C000", "700", "0")
+
+    client._requests.post = fake_post({}, on_post=on_post)
+
+    client.addPendingWrite("home0", "C000", "650", "3")
+    assert await client.pushTemperature("home0", "C000", "650", "3")
+    device = client.getDevice("home0", "C0_0_0")
+    assert (device.gv_mode, device.consigne_confort) == ("0", 70.0)
+
+
+async def test_response_is_decoded_once(caplog):
+    """Test the status check and error logging share a single decode."""
+
+    class Response:
+        status = 200
+        reads = 0
+
+        def __init__(self, body: dict):
+            self.body = body
+
+        async def read(self) -> bytes:
+            self.reads += 1
+            return json.dumps(self.body).encode()
+
+    ok = Response({"code": {"code": "1", "key": "OK", "value": "OK"}, "data": {}})
+    assert (await WattsApi.check_response(ok))["data"] == {}
+    assert ok.reads == 1
+
+    error = Response(
+        {"code": {"code": "2", "key": "ERROR", "value": "Bad"}, "data": "details"}
+    )
+    assert await WattsApi.check_response(error) is None
+    assert error.reads == 1
+    assert "Value: Bad, Data: details" in caplog.text
+
+
+@pytest.mark.parametrize("keep_raw", [False, True])
+async def test_smart_homes_are_projected(make_client, keep_raw: bool):
+    """Test only the smart home fields the platforms read are retained."""
+    client = make_client(keep_raw=keep_raw)
+    smarthome = {
+        "smarthome_id": "home0",
+        "label": "Home",
+        "mac_address": "00:00:00:00:00:00",
+        "general_mode": "0",
+        "timezone": "Europe/Amsterdam",
+    }
+
+    client._requests.post = fake_post({"smarthomes": [smarthome]})
+
+    assert await client.loadSmartHomes() == [
+        {"smarthome_id": "home0", "label": "Home", "mac_address": "00:00:00:00:00:00"}
+    ]
+
+    # The raw size is reported to compare against, also when it is not kept
+    report = client.memoryReport()
+    assert report["raw_bytes"] > report["retained_bytes"]
+    assert report["raw_retained"] is keep_raw
+    if keep_raw:
+        assert client.getRawData()["smarthomes"] == [smarthome]
+    else:
+        assert client.getRawData() is None
+
+
+async def test_identical_reads_in_flight_share_one_request(make_client):
+    """Test concurrent reads of the same endpoint and smart home post once."""
+    client = make_client()
+    posted = []
+
+    async def on_post(url: str, data: dict) -> None:
+        posted.append((url, data["smarthome_id"]))
+        await asyncio.sleep(0.01)
+
+    client._requests.post = fake_post({"zones": [], "diffObj": {}}, on_post=on_post)
+
+    await asyncio.gather(
+        client.getLastCommunication("home0"),
+        client.getLastCommunication("home0"),
+        client.loadDevices("home0"),
+        client.loadDevices("home1"),
+    )
+    assert len(posted) == 3
+    assert client.deduplicatedReads == 1
+    assert client.dedupRate == 0.25